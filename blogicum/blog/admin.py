@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, Location, Post, Task
+from .queue import enqueue
+from .tasks import process_post_image_task
 
 
 class PostInLine(admin.TabularInline):
@@ -31,6 +33,12 @@ class CommentAdmin(admin.ModelAdmin):
     list_editable = ('is_published',)
     list_filter = ('is_published',)
 
+    def get_readonly_fields(self, request, obj=None):
+        # Перенос комментария сломал бы счётчики у обеих публикаций.
+        if obj is not None:
+            return ('post',)
+        return ()
+
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
@@ -52,3 +60,15 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('category', 'is_published', 'location')
     list_filter = ('created_at',)
     empty_value_display = '-пусто-'
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            enqueue(process_post_image_task, post_id=obj.pk)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_after')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_at', 'last_error', 'created_at')
@@ -0,0 +1,208 @@
+"""JSON API только для чтения: ленты, публикация, комментарии.
+
+Строки выбираются через values() только с запрошенными полями
+(?fields=title,author), так что модели не создаются, а JOIN
+добавляются лишь для полей связанных таблиц. Списки листаются
+курсором (?after=) и отдаются потоком: ответ кодируется по строке
+по мере чтения из базы через iterator(). ?ids=1,2,3 выбирает
+несколько публикаций одним запросом.
+"""
+import json
+
+from django.core.exceptions import BadRequest
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.generic import View
+
+from .constants import API_MAX_IDS, API_MAX_LIMIT, API_PAGINATE_COUNT
+from .mixins import UrlObjectsMixin
+from .models import Comment, Post
+from .paginators import CursorPaginator, InvalidCursor
+
+POST_FIELDS = {
+    'id': 'pk',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+
+COMMENT_FIELDS = {
+    'id': 'pk',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+
+CONVERTERS = {
+    'image': lambda name: default_storage.url(name) if name else None,
+}
+
+
+def encode(data) -> str:
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+class ApiMixin:
+    """Разбор ?fields= и сериализация строк values()."""
+
+    fields_map = POST_FIELDS
+    read_from_replica = True
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except BadRequest as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404 as error:
+            return JsonResponse({'error': str(error)}, status=404)
+
+    def get_fields(self) -> tuple:
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return tuple(self.fields_map)
+        fields = tuple(dict.fromkeys(
+            name.strip() for name in requested.split(',') if name.strip()
+        ))
+        unknown = set(fields) - set(self.fields_map)
+        if unknown:
+            raise BadRequest(
+                f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            )
+        return fields
+
+    def get_lookups(self, fields, required=()) -> tuple:
+        lookups = [self.fields_map[name] for name in fields]
+        return tuple(dict.fromkeys((*lookups, *required)))
+
+    def serialize(self, row: dict, fields) -> dict:
+        data = {}
+        for name in fields:
+            value = row[self.fields_map[name]]
+            converter = CONVERTERS.get(name)
+            data[name] = converter(value) if converter else value
+        return data
+
+
+class CursorListMixin(ApiMixin):
+    """Поточный список с курсором на следующую страницу."""
+
+    ordering = ('-pub_date', '-pk')
+
+    def get_limit(self) -> int:
+        try:
+            limit = int(self.request.GET.get('limit', API_PAGINATE_COUNT))
+        except ValueError:
+            raise BadRequest('limit должен быть числом.')
+        return min(max(limit, 1), API_MAX_LIMIT)
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        required = tuple(field.lstrip('-') for field in self.ordering)
+        paginator = CursorPaginator(
+            self.get_queryset().values(*self.get_lookups(fields, required)),
+            self.get_limit(),
+            ordering=self.ordering,
+        )
+        try:
+            rows = paginator.get_page_queryset(after=request.GET.get('after'))
+        except InvalidCursor as error:
+            raise BadRequest(str(error))
+        # База выбирается сейчас: поток читается уже после того,
+        # как ReplicaRoutingMiddleware вернул маршрутизацию на основную.
+        rows = rows.using(rows.db)
+        return StreamingHttpResponse(
+            self.stream(rows, paginator, fields),
+            content_type='application/json',
+        )
+
+    def stream(self, rows, paginator, fields):
+        yield '{"results":['
+        last = None
+        for number, row in enumerate(rows.iterator()):
+            if number == paginator.per_page:
+                break
+            if last is not None:
+                yield ','
+            yield encode(self.serialize(row, fields))
+            last = row
+        has_next = last is not None and number == paginator.per_page
+        next_cursor = paginator.encode_cursor(last) if has_next else None
+        yield f'],"next":{encode(next_cursor)}}}'
+
+
+class PostListApiView(CursorListMixin, View):
+    """Лента публикаций или пакет публикаций по ?ids=."""
+
+    def get_queryset(self):
+        return Post.objects.visible()
+
+    def get_ids(self):
+        try:
+            ids = [int(pk) for pk in self.request.GET['ids'].split(',')]
+        except ValueError:
+            raise BadRequest('ids - список чисел через запятую.')
+        if len(ids) > API_MAX_IDS:
+            raise BadRequest(f'Не больше {API_MAX_IDS} ids за запрос.')
+        return ids
+
+    def get(self, request, *args, **kwargs):
+        if 'ids' not in request.GET:
+            return super().get(request, *args, **kwargs)
+        ids = self.get_ids()
+        fields = self.get_fields()
+        rows = Post.objects.viewable_by(request.user).filter(
+            pk__in=ids
+        ).values(*self.get_lookups(fields, ('pk',)))
+        found = {row['pk']: row for row in rows}
+        # Порядок ответа - порядок ids; недоступные публикации пропущены.
+        return JsonResponse({'results': [
+            self.serialize(found[pk], fields) for pk in ids if pk in found
+        ]}, json_dumps_params={'ensure_ascii': False})
+
+
+class CategoryPostsApiView(UrlObjectsMixin, CursorListMixin, View):
+
+    def get_queryset(self):
+        return self.category.posts.visible()
+
+
+class ProfilePostsApiView(UrlObjectsMixin, CursorListMixin, View):
+
+    def get_queryset(self):
+        posts = self.author.posts.all()
+        if self.author != self.request.user:
+            posts = posts.visible()
+        return posts
+
+
+class PostDetailApiView(ApiMixin, View):
+
+    def get(self, request, post_id):
+        fields = self.get_fields()
+        row = Post.objects.viewable_by(request.user).filter(
+            pk=post_id
+        ).values(*self.get_lookups(fields)).first()
+        if row is None:
+            raise Http404('Публикация не найдена.')
+        return JsonResponse(
+            self.serialize(row, fields),
+            json_dumps_params={'ensure_ascii': False},
+        )
+
+
+class CommentListApiView(CursorListMixin, View):
+    fields_map = COMMENT_FIELDS
+    ordering = ('created_at', 'pk')
+
+    def get_queryset(self):
+        posts = Post.objects.viewable_by(self.request.user)
+        if not posts.filter(pk=self.kwargs['post_id']).exists():
+            raise Http404('Публикация не найдена.')
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
@@ -0,0 +1,128 @@
+"""Замеры горячих путей блога: время ответа и число SQL-запросов.
+
+Каждый сценарий - запрос тестового клиента от имени пользователя
+с публикациями; перед каждым повтором кэш очищается, чтобы замер
+отражал работу с базой, а не попадание в кэш страниц.
+"""
+import statistics
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Category, Post, User
+
+
+def get_targets() -> dict:
+    """Самые нагруженные объекты набора данных: на них и замеряем."""
+    author = User.objects.annotate(
+        posts_count=Count('posts')
+    ).order_by('-posts_count').first()
+    category = Category.objects.filter(is_published=True).annotate(
+        posts_count=Count('posts')
+    ).order_by('-posts_count').first()
+    post = Post.objects.visible().for_detail().order_by(
+        '-comment_count'
+    ).first()
+    if author is None or category is None or post is None:
+        raise ValueError('Набор данных пуст.')
+    return {'author': author, 'category': category, 'post': post}
+
+
+def get_scenarios(targets: dict) -> dict:
+    post, category = targets['post'], targets['category']
+    return {
+        'index': ('get', reverse('blog:index'), None),
+        'category': (
+            'get', reverse('blog:category_posts', args=(category.slug,)),
+            None,
+        ),
+        'profile': (
+            'get', reverse('blog:profile', args=(post.author.username,)),
+            None,
+        ),
+        'detail': (
+            'get', reverse('blog:post_detail', args=(post.pk,)), None
+        ),
+        'comment_create': (
+            'post', reverse('blog:add_comment', args=(post.pk,)),
+            {'text': 'Комментарий из замера.'},
+        ),
+        'post_create': (
+            'post', reverse('blog:create_post'),
+            {
+                'title': 'Публикация из замера',
+                'text': 'Текст публикации из замера.',
+                'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+                'category': category.pk,
+                'is_published': True,
+            },
+        ),
+    }
+
+
+def measure(client: Client, method: str, url: str, data, repeat: int):
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = perf_counter()
+            response = getattr(client, method)(url, data)
+            timings.append((perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise ValueError(f'{url}: ответ {response.status_code}')
+        queries = max(queries, len(context))
+    timings.sort()
+    return {
+        'queries': queries,
+        'min_ms': round(timings[0], 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(
+            timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2
+        ),
+    }
+
+
+def run_benchmarks(repeat: int = 20, only=None) -> dict:
+    targets = get_targets()
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(targets['author'])
+    results = {}
+    for name, (method, url, data) in get_scenarios(targets).items():
+        if only and name not in only:
+            continue
+        results[name] = measure(client, method, url, data, repeat)
+    # Созданные замером публикации не должны влиять на следующий запуск.
+    Post.objects.filter(title='Публикация из замера').delete()
+    targets['post'].comments.filter(text='Комментарий из замера.').delete()
+    return results
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float):
+    """Возвращает список регрессий между двумя отчётами.
+
+    Регрессия - рост медианы времени больше чем на threshold (доля)
+    или любое увеличение числа запросов.
+    """
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        if result['queries'] > before['queries']:
+            regressions.append(
+                f'{name}: запросов {before["queries"]} -> '
+                f'{result["queries"]}'
+            )
+        if result['median_ms'] > before['median_ms'] * (1 + threshold):
+            regressions.append(
+                f'{name}: медиана {before["median_ms"]} ms -> '
+                f'{result["median_ms"]} ms'
+            )
+    return regressions
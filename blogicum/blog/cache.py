@@ -0,0 +1,95 @@
+import hashlib
+import time
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+FEED_COUNT_PREFIX = 'blog:feed-count'
+FEED_COUNT_GENERATION_KEY = f'{FEED_COUNT_PREFIX}:generation'
+
+
+def get_feed_count_generation() -> int:
+    return cache.get_or_set(FEED_COUNT_GENERATION_KEY, time.time_ns, None)
+
+
+def get_feed_count_key(feed: str, pk: Optional[int] = None) -> str:
+    """Ключ кэша с числом публикаций в ленте.
+
+    feed - 'index', 'category', 'author' или 'author-all' (лента автора
+    без фильтров публикации, которую видит сам автор).
+    """
+    suffix = f':{pk}' if pk is not None else ''
+    return (
+        f'{FEED_COUNT_PREFIX}:{get_feed_count_generation()}:{feed}{suffix}'
+    )
+
+
+def invalidate_feed_counts(
+    category_ids: Iterable[Optional[int]] = (),
+    author_ids: Iterable[int] = (),
+) -> None:
+    keys = [get_feed_count_key('index')]
+    keys += [
+        get_feed_count_key('category', pk)
+        for pk in category_ids if pk is not None
+    ]
+    for pk in author_ids:
+        keys += [
+            get_feed_count_key('author', pk),
+            get_feed_count_key('author-all', pk),
+        ]
+    cache.delete_many(keys)
+
+
+def invalidate_all_feed_counts() -> None:
+    cache.set(FEED_COUNT_GENERATION_KEY, time.time_ns(), None)
+
+
+TAG_PREFIX = 'blog:tag'
+RESPONSE_PREFIX = 'blog:response'
+
+
+def get_tag_versions(tags: Iterable[str]) -> dict:
+    """Текущие версии тегов; отсутствующим тегам назначается новая."""
+    keys = {f'{TAG_PREFIX}:{tag}': tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_tags(*tags: str) -> None:
+    version = time.time_ns()
+    cache.set_many({f'{TAG_PREFIX}:{tag}': version for tag in tags}, None)
+
+
+def get_post_cache_tags(post) -> list:
+    return [
+        f'post:{post.pk}',
+        f'author:{post.author_id}',
+        f'category:{post.category_id}',
+        f'location:{post.location_id}',
+    ]
+
+
+def get_response_cache_key(request) -> str:
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{RESPONSE_PREFIX}:{path}'
+
+
+def get_cached_response(key: str):
+    """Ответ из кэша, если ни один из его тегов не был сброшен."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    response, versions = entry
+    if get_tag_versions(versions) != versions:
+        return None
+    return response
+
+
+def cache_response(key: str, response, tags: Iterable[str], timeout: int):
+    if timeout > 0:
+        cache.set(key, (response, get_tag_versions(set(tags))), timeout)
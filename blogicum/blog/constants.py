@@ -1,5 +1,34 @@
+ANONYMOUS_CACHE_TIMEOUT = 60 * 10
+API_MAX_IDS = 100
+API_MAX_LIMIT = 500
+API_PAGINATE_COUNT = 50
 COMMENT_PREVIEW_LENGTH = 50
+COMMENTS_PAGINATE_COUNT = 20
+FEED_CACHE_TIMEOUT = 60 * 10
+FEED_COUNT_CACHE_TIMEOUT = 60 * 5
+FEED_ITEMS_COUNT = 20
+IMAGE_QUALITY = 80
+IMAGE_VARIANTS = {
+    'thumb': 320,
+    'card': 640,
+    'full': 1280,
+}
 MAX_FIELD_LENGTH = 256
+NEXT_PUBLICATION_CACHE_TIMEOUT = 60
 PAGINATE_COUNT = 10
+PAGE_RANGE_ON_EACH_SIDE = 2
+PAGE_RANGE_ON_ENDS = 1
 POSTS_BY_PAGE = 5
+POST_CARD_CACHE_TIMEOUT = 60 * 60
 REPRESENTATION_LENGTH = 20
+SEARCH_INDEX_CHUNK_SIZE = 2000
+SEARCH_MAX_RESULTS = 1000
+SEARCH_QUERY_LENGTH = 100
+SEED_BATCH_SIZE = 5000
+SITEMAP_SEGMENT_SIZE = 10000
+TASK_BATCH_SIZE = 20
+TASK_LOCK_TIMEOUT = 60 * 10
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 30
+TASK_STATUS_LENGTH = 16
+VISIBILITY_CHUNK_SIZE = 10000
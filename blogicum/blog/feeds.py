@@ -0,0 +1,141 @@
+"""RSS- и Atom-ленты главной страницы, категорий и авторов.
+
+Публикации читаются через iterator(), без кэша результатов queryset,
+и не больше FEED_ITEMS_COUNT, так что память на ленту ограничена.
+Готовый XML кэшируется с тегами, как страницы AnonymousCacheMixin,
+и отдаётся с ETag: читатель лент, опрашивающий её раз в минуту,
+получает 304 без единого запроса к базе.
+"""
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import parse_http_date_safe
+
+from . import cache
+from .constants import FEED_CACHE_TIMEOUT, FEED_ITEMS_COUNT
+from .models import Category, Post, User
+from .scheduling import get_cache_horizon
+
+FEED_TYPES = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+
+
+class PostFeed(Feed):
+    """Базовая лента; экземпляр создаётся на каждый запрос (as_view)."""
+
+    def __init__(self, feed_type):
+        self.feed_type = feed_type
+        self.cache_tags = {'feed'}
+
+    @classmethod
+    def as_view(cls):
+        def view(request, feed_format, *args, **kwargs):
+            if feed_format not in FEED_TYPES:
+                raise Http404('Неизвестный формат ленты.')
+            return cls(FEED_TYPES[feed_format])(request, *args, **kwargs)
+        return view
+
+    def __call__(self, request, *args, **kwargs):
+        key = cache.get_response_cache_key(request)
+        response = cache.get_cached_response(key)
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+            response['ETag'] = quote_etag(
+                hashlib.md5(response.content).hexdigest()
+            )
+            cache.cache_response(
+                key, response, self.cache_tags,
+                get_cache_horizon(FEED_CACHE_TIMEOUT),
+            )
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')
+            ),
+            response=response,
+        )
+
+    def get_queryset(self, obj):
+        return Post.objects.visible().for_feed()
+
+    def items(self, obj):
+        posts = self.get_queryset(obj)[:FEED_ITEMS_COUNT]
+        for post in posts.iterator():
+            self.cache_tags.update(cache.get_post_cache_tags(post))
+            yield post
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return (item.category.title,) if item.category else ()
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class LatestPostsFeed(PostFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryFeed(PostFeed):
+
+    def get_object(self, request, category_slug):
+        category = get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+        self.cache_tags.add(f'category:{category.pk}')
+        return category
+
+    def get_queryset(self, obj):
+        return obj.posts.visible().for_feed()
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=(obj.slug,))
+
+
+class AuthorFeed(PostFeed):
+
+    def get_object(self, request, username):
+        author = get_object_or_404(User, username=username)
+        self.cache_tags.add(f'author:{author.pk}')
+        return author
+
+    def get_queryset(self, obj):
+        return obj.posts.visible().for_feed()
+
+    def title(self, obj):
+        return f'Блогикум: {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=(obj.username,))
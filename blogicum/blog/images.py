@@ -0,0 +1,82 @@
+"""Уменьшенные копии изображений публикаций.
+
+Для каждой картинки создаются варианты из IMAGE_VARIANTS в форматах
+JPEG и WebP; их пути и размеры хранятся в Post.image_meta, чтобы
+шаблоны могли строить srcset и задавать размеры без чтения файлов.
+"""
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .constants import IMAGE_QUALITY, IMAGE_VARIANTS
+
+IMAGE_FORMATS = (
+    ('jpeg', 'jpg'),
+    ('webp', 'webp'),
+)
+VARIANTS_DIR = 'post_images/variants'
+
+
+def build_image_meta(image_file) -> dict:
+    with Image.open(image_file) as source:
+        # exif_transpose поворачивает снимок по EXIF, а сохранение
+        # без параметра exif отбрасывает все метаданные.
+        image = ImageOps.exif_transpose(source).convert('RGB')
+
+    stem = PurePosixPath(image_file.name).stem
+    meta = {'width': image.width, 'height': image.height, 'variants': []}
+    for name, max_width in IMAGE_VARIANTS.items():
+        variant = image.copy()
+        variant.thumbnail((max_width, max_width * 4), Image.Resampling.LANCZOS)
+        for image_format, extension in IMAGE_FORMATS:
+            buffer = BytesIO()
+            variant.save(
+                buffer, format=image_format.upper(),
+                quality=IMAGE_QUALITY, optimize=True,
+            )
+            path = default_storage.save(
+                f'{VARIANTS_DIR}/{stem}-{name}.{extension}',
+                ContentFile(buffer.getvalue()),
+            )
+            meta['variants'].append({
+                'name': name,
+                'format': image_format,
+                'path': path,
+                'width': variant.width,
+                'height': variant.height,
+            })
+    return meta
+
+
+def delete_variants(meta: dict) -> None:
+    for variant in meta.get('variants', ()):
+        default_storage.delete(variant['path'])
+
+
+def process_post_image(post) -> None:
+    """Пересоздаёт варианты изображения поста после загрузки."""
+    delete_variants(post.image_meta)
+    post.image_meta = build_image_meta(post.image) if post.image else {}
+    post.save(update_fields=('image_meta', 'updated_at'))
+
+
+def get_variant(meta: dict, name: str, image_format: str = 'jpeg'):
+    for variant in meta.get('variants', ()):
+        if variant['name'] == name and variant['format'] == image_format:
+            return variant
+    return None
+
+
+def get_variant_url(variant: dict) -> str:
+    return default_storage.url(variant['path'])
+
+
+def get_srcset(meta: dict, image_format: str = 'jpeg') -> str:
+    return ', '.join(
+        f"{get_variant_url(variant)} {variant['width']}w"
+        for variant in meta.get('variants', ())
+        if variant['format'] == image_format
+    )
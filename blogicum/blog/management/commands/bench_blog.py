@@ -0,0 +1,107 @@
+import json
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from blog.benchmarks import compare_reports, run_benchmarks
+from blog.models import Post
+from blog.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт отдельную базу с синтетическими данными, замеряет время '
+        'ответа и число запросов основных страниц и сохраняет отчёт в '
+        'JSON. С --compare сравнивает результат с прошлым отчётом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=10_000,
+            help='Размер набора данных: 10000, 100000, 1000000.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора данных.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз повторять каждый сценарий.'
+        )
+        parser.add_argument(
+            '--only', nargs='*',
+            help='Запустить только перечисленные сценарии.'
+        )
+        parser.add_argument(
+            '--output', help='Куда сохранить отчёт в формате JSON.'
+        )
+        parser.add_argument(
+            '--compare', help='Отчёт прошлого запуска для сравнения.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост медианы времени, доля (0.2 = 20%%).'
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help=(
+                'Сохранить базу с данными в файле рядом с проектом и '
+                'использовать её при следующем запуске.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            baseline = json.loads(Path(options['compare']).read_text())
+
+        old_name = connection.settings_dict['NAME']
+        if options['keepdb'] and connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = str(
+                settings.BASE_DIR
+                / f'bench_{options["posts"]}_{options["seed"]}.sqlite3'
+            )
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        if options['output']:
+            Path(options['output']).write_text(
+                json.dumps(report, ensure_ascii=False, indent=2)
+            )
+        if baseline is not None:
+            regressions = compare_reports(
+                baseline, report, options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def run(self, options):
+        if not Post.objects.exists():
+            self.stderr.write(f'Генерация данных: {options["posts"]} постов')
+            Seeder(seed=options['seed']).seed(options['posts'])
+        return {
+            'meta': {
+                'posts': options['posts'],
+                'seed': options['seed'],
+                'repeat': options['repeat'],
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'created_at': timezone.now().isoformat(),
+            },
+            'scenarios': run_benchmarks(options['repeat'], options['only']),
+        }
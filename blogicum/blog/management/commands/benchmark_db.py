@@ -0,0 +1,127 @@
+import random
+import threading
+from time import perf_counter, sleep
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from blog.constants import PAGINATE_COUNT
+from blog.models import Comment, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает базу параллельными чтениями ленты и записью '
+        'комментариев и выводит пропускную способность и число ошибок '
+        'блокировки. Созданные комментарии удаляются после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=4,
+            help='Число потоков, читающих главную ленту.'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2,
+            help='Число потоков, добавляющих комментарии.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=10.0,
+            help='Длительность замера в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        post_ids = list(
+            Post.objects.visible().values_list('pk', flat=True)[:100]
+        )
+        author_ids = list(User.objects.values_list('pk', flat=True)[:100])
+        if not post_ids or not author_ids:
+            raise CommandError(
+                'Нужны опубликованные посты и пользователи (см. seed_blog).'
+            )
+        self.show_settings()
+
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.stats = {
+            'read': [], 'write': [], 'locked': 0, 'comment_ids': []
+        }
+        workers = [
+            threading.Thread(target=self.run_reader)
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=self.run_writer, args=(post_ids, author_ids)
+            )
+            for _ in range(options['writers'])
+        ]
+        for worker in workers:
+            worker.start()
+        sleep(options['duration'])
+        self.stop.set()
+        for worker in workers:
+            worker.join()
+
+        Comment.objects.filter(pk__in=self.stats['comment_ids']).delete()
+        self.report(options['duration'])
+
+    def show_settings(self):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{connection.vendor}, CONN_MAX_AGE='
+            f'{connection.settings_dict["CONN_MAX_AGE"]}'
+        ))
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout'):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.stdout.write(f'{pragma} = {cursor.fetchone()[0]}')
+
+    def run_worker(self, operation, kind):
+        # Каждый поток работает через своё соединение с базой.
+        try:
+            while not self.stop.is_set():
+                started = perf_counter()
+                try:
+                    result = operation()
+                except OperationalError:
+                    with self.lock:
+                        self.stats['locked'] += 1
+                    continue
+                with self.lock:
+                    self.stats[kind].append(perf_counter() - started)
+                    if result is not None:
+                        self.stats['comment_ids'].append(result)
+        finally:
+            connection.close()
+
+    def run_reader(self):
+        def read():
+            list(Post.objects.visible().for_feed()[:PAGINATE_COUNT])
+
+        self.run_worker(read, 'read')
+
+    def run_writer(self, post_ids, author_ids):
+        def write():
+            with transaction.atomic():
+                return Comment.objects.create(
+                    post_id=random.choice(post_ids),
+                    author_id=random.choice(author_ids),
+                    text='benchmark',
+                ).pk
+
+        self.run_worker(write, 'write')
+
+    def report(self, duration):
+        for kind in ('read', 'write'):
+            timings = sorted(self.stats[kind])
+            if not timings:
+                self.stdout.write(f'{kind}: нет успешных операций')
+                continue
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'{kind}: {len(timings) / duration:.1f} оп/с, '
+                f'p95 {p95 * 1000:.2f} ms'
+            )
+        self.stdout.write(
+            f'Ошибок блокировки: {self.stats["locked"]}'
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import SitemapBuilder
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает карту сайта в статические файлы BLOG_SITEMAP_ROOT: '
+        'индекс и сегменты по диапазонам id. Без --full перезаписываются '
+        'только сегменты, в которых изменились публикации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересобрать все сегменты, не сверяясь с manifest.json.'
+        )
+        parser.add_argument(
+            '--root', help='Каталог для файлов вместо BLOG_SITEMAP_ROOT.'
+        )
+
+    def handle(self, *args, **options):
+        written = SitemapBuilder(options['root']).build(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            'Обновлено сегментов: '
+            + ', '.join(f'{kind}: {count}' for kind, count in written.items())
+        ))
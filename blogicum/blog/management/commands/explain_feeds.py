@@ -0,0 +1,56 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from blog.constants import PAGINATE_COUNT
+from blog.models import Category, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит планы выполнения (EXPLAIN) и время запросов ленты для '
+        'главной страницы, страницы категории и профиля. Запускайте на '
+        'базе с большим объёмом данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз выполнить каждый запрос для замера времени.'
+        )
+        parser.add_argument(
+            '--page', type=int, default=1,
+            help='Номер страницы ленты, для которой строится запрос.'
+        )
+
+    def get_feeds(self):
+        feeds = {'index': Post.objects.visible().for_feed()}
+        category = Category.objects.filter(is_published=True).annotate(
+            posts_count=Count('posts')
+        ).order_by('-posts_count').first()
+        if category is not None:
+            feeds['category'] = category.posts.visible().for_feed()
+        author = User.objects.annotate(
+            posts_count=Count('posts')
+        ).order_by('-posts_count').first()
+        if author is not None:
+            feeds['profile'] = author.posts.visible().for_feed()
+            feeds['profile (owner)'] = author.posts.for_feed()
+        return feeds
+
+    def handle(self, *args, **options):
+        offset = (options['page'] - 1) * PAGINATE_COUNT
+        for name, queryset in self.get_feeds().items():
+            page = queryset[offset:offset + PAGINATE_COUNT]
+            timings = []
+            for _ in range(options['repeat']):
+                started = perf_counter()
+                list(page.all())
+                timings.append((perf_counter() - started) * 1000)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(page.explain())
+            self.stdout.write(
+                f'min {min(timings):.2f} ms, '
+                f'max {max(timings):.2f} ms\n'
+            )
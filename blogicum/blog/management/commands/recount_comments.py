@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.service import get_broken_comment_counters, recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'post_ids', nargs='*', type=int,
+            help='Идентификаторы публикаций; по умолчанию - все.'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только вывести число неверных счётчиков.'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['post_ids']:
+            queryset = queryset.filter(pk__in=options['post_ids'])
+        if options['check']:
+            broken = get_broken_comment_counters(queryset).count()
+            self.stdout.write(f'Неверных счётчиков: {broken}')
+            return
+        fixed = recount_comments(queryset)
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}')
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_all_feed_counts, invalidate_tags
+from blog.constants import VISIBILITY_CHUNK_SIZE
+from blog.scheduling import reset_next_publication
+from blog.service import repair_posts_visibility
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает флаг is_public у публикаций по флагам публикации '
+        'поста и его категории, обходя таблицу диапазонами id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=VISIBILITY_CHUNK_SIZE,
+            help='Сколько id обрабатывать за один UPDATE.'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for last_id, fixed in repair_posts_visibility(options['chunk_size']):
+            total += fixed
+            if options['verbosity'] > 1:
+                self.stdout.write(f'id <= {last_id}: исправлено {fixed}')
+        if total:
+            # Исправленные посты появляются в лентах или пропадают из них.
+            invalidate_all_feed_counts()
+            invalidate_tags('feed')
+            reset_next_publication()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено публикаций: {total}')
+        )
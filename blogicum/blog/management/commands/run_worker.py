@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import tasks  # noqa: F401 - регистрирует задачи блога.
+from blog.constants import TASK_BATCH_SIZE
+from blog.queue import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать задачи, готовые к запуску, и завершиться.'
+        )
+        parser.add_argument(
+            '--batch', type=int, default=TASK_BATCH_SIZE,
+            help='Сколько задач забирать за один раз.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending(options['batch'])
+            if processed:
+                self.stdout.write(f'Обработано задач: {processed}')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
@@ -0,0 +1,98 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.constants import SEED_BATCH_SIZE
+from blog.models import Category, Comment, Location, Post, User
+from blog.seeding import DISTRIBUTION, Seeder, reset_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями, '
+        'местоположениями, публикациями и комментариями для нагрузочного '
+        'тестирования лент.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=100_000,
+            help='Сколько публикаций создать.'
+        )
+        parser.add_argument(
+            '--users', type=int,
+            help='Сколько пользователей создать (по умолчанию posts / 20).'
+        )
+        parser.add_argument(
+            '--categories', type=int,
+            help='Сколько категорий создать (по умолчанию posts / 2000).'
+        )
+        parser.add_argument(
+            '--locations', type=int,
+            help='Сколько местоположений создать (по умолчанию posts / 1000).'
+        )
+        parser.add_argument(
+            '--comments', type=int,
+            help='Сколько комментариев создать (по умолчанию posts * 2).'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_BATCH_SIZE,
+            help='Сколько строк вставлять одним запросом.'
+        )
+        parser.add_argument(
+            '--flush', action='store_true',
+            help=(
+                'Перед генерацией удалить все публикации, категории, '
+                'местоположения и ранее созданных пользователей seed_user_*.'
+            )
+        )
+        for name, default in DISTRIBUTION.items():
+            parser.add_argument(
+                f'--{name.replace("_", "-")}', type=float, default=default,
+                dest=name, help=f'Доля, по умолчанию {default}.'
+            )
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        if options['flush']:
+            self.flush()
+
+        seeder = Seeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            log=lambda message: self.stdout.write(
+                f'[{perf_counter() - started:7.1f} s] {message}'
+            ),
+            **{name: options[name] for name in DISTRIBUTION},
+        )
+        counts = seeder.seed(
+            options['posts'],
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            comments=options['comments'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{name}: {count}' for name, count in counts.items())
+            + f' за {perf_counter() - started:.1f} s'
+        ))
+
+    def flush(self):
+        self.stdout.write('Удаление данных...')
+        with transaction.atomic():
+            # Построчное удаление через ORM с сигналами на миллионах
+            # строк заняло бы больше времени, чем сама генерация.
+            with connection.cursor() as cursor:
+                for model in (Comment, Post):
+                    cursor.execute(f'DELETE FROM {model._meta.db_table}')
+            Category.objects.all().delete()
+            Location.objects.all().delete()
+            User.objects.filter(username__startswith='seed_user_').delete()
+        # Сигналы удаления публикаций не сработали: индекс и кэш
+        # сбрасываются так же, как после генерации.
+        reset_caches()
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из '
+        'BLOGICUM_DB_REPLICAS. Нужна для локальной проверки чтения '
+        'с реплик: настоящей репликации у SQLite нет.'
+    )
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('Основная база должна быть SQLite.')
+        primary.ensure_connection()
+        for alias in settings.BLOG_REPLICA_DATABASES:
+            replica = connections[alias]
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(
+                f'{alias}: {replica.settings_dict["NAME"]} обновлена'
+            )
@@ -0,0 +1,154 @@
+import json
+import logging
+import random
+from collections import Counter
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from .routers import read_from_replica
+
+PRIMARY_PIN_COOKIE = 'blog_primary'
+
+logger = logging.getLogger('blog.requests')
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение страниц-лент и постов на реплики.
+
+    Реплика используется для GET/HEAD-запросов к представлениям
+    с атрибутом read_from_replica = True. После любого изменяющего
+    запроса клиент получает cookie и BLOG_REPLICA_PIN_SECONDS секунд
+    читает из основной базы, чтобы сразу увидеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.replica_token is not None:
+                read_from_replica.reset(request.replica_token)
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and settings.BLOG_REPLICA_DATABASES):
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1',
+                max_age=settings.BLOG_REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (request.method in ('GET', 'HEAD')
+                and getattr(view_class, 'read_from_replica', False)
+                and PRIMARY_PIN_COOKIE not in request.COOKIES):
+            request.replica_token = read_from_replica.set(True)
+
+
+class RequestMetrics:
+    """Запросы к базе и время отрисовки шаблона одного HTTP-запроса."""
+
+    def __init__(self):
+        self.queries = Counter()
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка для connection.execute_wrapper().
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.queries[(sql, repr(params))] += 1
+
+    @property
+    def query_count(self) -> int:
+        return sum(self.queries.values())
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(count - 1 for count in self.queries.values())
+
+    def start_render(self):
+        self.render_started = perf_counter()
+
+    def finish_render(self, response):
+        self.render_time = perf_counter() - self.render_started
+
+
+class RequestMetricsMiddleware:
+    """Замеряет SQL-запросы и отрисовку шаблона для части запросов.
+
+    Включается настройкой BLOG_REQUEST_METRICS; доля замеряемых
+    запросов задаётся BLOG_REQUEST_METRICS_SAMPLE_RATE. Результат
+    передаётся в заголовке Server-Timing и пишется в лог blog.requests.
+    Время отрисовки включает запросы, выполненные из шаблона.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        request.metrics = metrics = RequestMetrics()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        total_time = perf_counter() - started
+
+        timings = [
+            ('db', metrics.db_time,
+             f'{metrics.query_count} queries, '
+             f'{metrics.duplicate_count} duplicates'),
+            ('render', metrics.render_time, 'template'),
+            ('total', total_time, 'request'),
+        ]
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.1f};desc="{description}"'
+            for name, duration, description in timings
+            if duration is not None
+        )
+
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': metrics.query_count,
+            'duplicates': metrics.duplicate_count,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'render_ms': (
+                round(metrics.render_time * 1000, 2)
+                if metrics.render_time is not None else None
+            ),
+            'total_ms': round(total_time * 1000, 2),
+        }
+        logger.info(json.dumps(record), extra={'metrics': record})
+        return response
+
+    def is_sampled(self) -> bool:
+        if not getattr(settings, 'BLOG_REQUEST_METRICS', False):
+            return False
+        rate = getattr(settings, 'BLOG_REQUEST_METRICS_SAMPLE_RATE', 1.0)
+        return rate >= 1 or random.random() < rate
+
+    def process_template_response(self, request, response):
+        # Вызывается непосредственно перед response.render().
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            metrics.start_render()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Размеры и варианты изображения'),
+        ),
+    ]
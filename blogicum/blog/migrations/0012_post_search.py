@@ -0,0 +1,62 @@
+import re
+
+import snowballstemmer
+from django.db import migrations
+
+# Копия blog.search.stem_words на момент миграции: исторические
+# миграции не должны зависеть от текущего кода приложения.
+WORD_RE = re.compile(r'\w+')
+stemmer = snowballstemmer.stemmer('russian')
+
+
+def stem_words(text):
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return [stemmer.stemWord(word) for word in words]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Выражение должно совпадать с SearchVector('title', 'text',
+        # config='russian'), иначе планировщик не использует индекс.
+        schema_editor.execute(
+            "CREATE INDEX blog_post_search_idx ON blog_post USING GIN "
+            "(to_tsvector('russian'::regconfig, "
+            "COALESCE(title, '') || ' ' || COALESCE(text, '')))"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+            "content, tokenize='unicode61 remove_diacritics 2')"
+        )
+        Post = apps.get_model('blog', 'Post')
+        rows = (
+            (pk, ' '.join(stem_words(f'{title} {text}')))
+            for pk, title, text in Post.objects.values_list(
+                'pk', 'title', 'text'
+            ).iterator()
+        )
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO blog_post_fts (rowid, content) VALUES (%s, %s)',
+                rows,
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS blog_post_search_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_task'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:56
+
+from django.db import migrations, models
+
+
+def fill_is_public(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).update(is_public=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_pub_date_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_public',
+            field=models.BooleanField(default=False, editable=False, help_text='Опубликованы и пост, и его категория.', verbose_name='Виден в ленте'),
+        ),
+        migrations.RunPython(fill_is_public, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['pub_date'], name='post_public_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+# Задачи теперь регистрируются под именем "модуль.имя".
+RENAMED = {
+    'process_post_image_task': 'blog.tasks.process_post_image_task',
+}
+
+
+def qualify_task_names(apps, schema_editor):
+    Task = apps.get_model('blog', 'Task')
+    for old, new in RENAMED.items():
+        Task.objects.filter(name=old).update(name=new)
+
+
+def unqualify_task_names(apps, schema_editor):
+    Task = apps.get_model('blog', 'Task')
+    for old, new in RENAMED.items():
+        Task.objects.filter(name=new).update(name=old)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_is_public'),
+    ]
+
+    operations = [
+        migrations.RunPython(qualify_task_names, unqualify_task_names),
+    ]
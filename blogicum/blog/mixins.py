@@ -1,14 +1,229 @@
-from django.shortcuts import redirect
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response, patch_response_headers, patch_vary_headers
+)
+from django.utils.functional import cached_property
+from django.utils.http import http_date, parse_http_date_safe
 
-from .constants import PAGINATE_COUNT
+from . import cache
+from .constants import (
+    ANONYMOUS_CACHE_TIMEOUT, COMMENTS_PAGINATE_COUNT, PAGINATE_COUNT,
+    POST_CARD_CACHE_TIMEOUT
+)
 from .forms import CommentForm, PostForm
-from .models import Comment, Post
+from .models import Category, Comment, Post, User
+from .paginators import CachedCountPaginator, CursorPaginator
+from .queue import enqueue
+from .scheduling import get_cache_horizon
+from .tasks import process_post_image_task
+
+
+class AnonymousCacheMixin:
+    """Кэширует страницу целиком для анонимных GET-запросов.
+
+    Кэш сбрасывается по тегам из get_cache_tags() и живёт не дольше,
+    чем до ближайшей отложенной публикации; тот же срок передаётся
+    в заголовках Expires и Cache-Control.
+    """
+
+    cache_timeout = ANONYMOUS_CACHE_TIMEOUT
+
+    def get_cache_tags(self, context):
+        return []
+
+    def get_cache_timeout(self):
+        return get_cache_horizon(self.cache_timeout)
+
+    def patch_cache_headers(self, response, timeout):
+        # Ответ из кэша несёт Expires от момента первого рендера.
+        if response.has_header('Expires'):
+            del response['Expires']
+        patch_response_headers(response, timeout)
+        patch_vary_headers(response, ('Cookie',))
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = cache.get_response_cache_key(request)
+        timeout = self.get_cache_timeout()
+        response = cache.get_cached_response(key)
+        if response is not None:
+            # Валидаторы сохранены вместе с ответом и актуальны, пока
+            # актуален сам ответ: 304 можно отдать без запросов к базе.
+            not_modified = get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified', '')
+                ),
+            )
+            response = not_modified or response
+            self.patch_cache_headers(response, timeout)
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(
+            response, 'add_post_render_callback'
+        ):
+            self.patch_cache_headers(response, timeout)
+            response.add_post_render_callback(
+                lambda rendered: cache.cache_response(
+                    key,
+                    rendered,
+                    self.get_cache_tags(rendered.context_data),
+                    timeout,
+                )
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, пока страница не изменилась.
+
+    Состояние страницы - один агрегирующий запрос по публикациям,
+    которые она показывает (get_validator_queryset): последние
+    updated_at постов, их категорий и местоположений, наименьший,
+    наибольший id и сумма id. Изменения комментариев и имени автора
+    сдвигают Post.updated_at (см. signals). Last-Modified отдаётся
+    только при use_last_modified: по дате нельзя заметить, что пост
+    пропал из ленты.
+    """
+
+    use_last_modified = False
+
+    def get_validator_queryset(self):
+        return None
+
+    def get_validator_extra(self):
+        return ()
+
+    def get_validators(self):
+        queryset = self.get_validator_queryset()
+        if queryset is None:
+            return None, None
+        state = Post.objects.filter(pk__in=queryset.values('pk')).aggregate(
+            updated_at=Max('updated_at'),
+            category_updated_at=Max('category__updated_at'),
+            location_updated_at=Max('location__updated_at'),
+            first_id=Min('pk'),
+            last_id=Max('pk'),
+            checksum=Sum('pk'),
+        )
+        if state['checksum'] is None:
+            return None, None
+
+        user = self.request.user
+        viewer = 'anonymous'
+        if user.is_authenticated:
+            # CSRF-токен в формах страницы меняется вместе с сессией
+            # при входе пользователя.
+            viewer = f'{user.pk}:{self.request.session.session_key}'
+        digest = hashlib.md5(
+            repr((viewer, state, self.get_validator_extra())).encode()
+        ).hexdigest()
+
+        last_modified = None
+        if self.use_last_modified:
+            last_modified = max(filter(None, (
+                state['updated_at'],
+                state['category_updated_at'],
+                state['location_updated_at'],
+            )))
+        return f'W/"{digest}"', last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators()
+        if etag is not None:
+            not_modified = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=(
+                    int(last_modified.timestamp()) if last_modified else None
+                ),
+            )
+            if not_modified is not None:
+                return not_modified
+
+        response = super().dispatch(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(
+                    last_modified.timestamp()
+                )
+        return response
+
+
+class UrlObjectsMixin:
+    """Объекты из параметров URL, загружаемые не больше раза за запрос.
+
+    Экземпляр представления создаётся на каждый запрос, поэтому
+    cached_property хранит объект ровно до конца запроса.
+    """
+
+    @cached_property
+    def category(self):
+        return get_object_or_404(
+            Category, slug=self.kwargs['category_slug'], is_published=True
+        )
+
+    @cached_property
+    def author(self):
+        return get_object_or_404(User, username=self.kwargs['username'])
+
+    @cached_property
+    def published_post(self):
+        # Нужен только id для комментария: без JOIN и лишних столбцов.
+        return get_object_or_404(
+            Post.objects.visible().only('pk'), pk=self.kwargs['post_id']
+        )
+
+    @cached_property
+    def viewable_post(self):
+        """Пост, который может видеть текущий пользователь."""
+        return get_object_or_404(
+            Post.objects.viewable_by(self.request.user),
+            pk=self.kwargs['post_id'],
+        )
+
+
+class CommentPageMixin:
+    comments_paginate_by = COMMENTS_PAGINATE_COUNT
+
+    def get_comments_page(self, post):
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            self.comments_paginate_by,
+            ordering=('created_at', 'pk'),
+        )
+        return paginator.page(after=self.request.GET.get('after'))
 
 
 class EditContentMixin:
+    """Пускает к редактированию только автора.
+
+    Объект загружается один раз: get/post/delete представления
+    получают тот же экземпляр, что и проверка авторства.
+    """
+
+    def get_object(self, queryset=None):
+        if 'object' not in self.__dict__:
+            self.object = super().get_object(queryset=queryset)
+        return self.object
+
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.id:
             return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -42,9 +257,80 @@ class PostMixin:
 class PostFormMixin(PostMixin):
     form_class = PostForm
 
+    def form_valid(self, form):
+        # Пост и задача обработки изображения коммитятся вместе.
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if 'image' in form.changed_data:
+                enqueue(process_post_image_task, post_id=self.object.pk)
+        return response
+
 
-class PostListMixin(PostMixin):
+class PostListMixin(AnonymousCacheMixin, ConditionalGetMixin, PostMixin):
     paginate_by = PAGINATE_COUNT
+    paginator_class = CachedCountPaginator
+    cursor_pagination = None
+    read_from_replica = True
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_cache_tags(self, context):
+        tags = ['feed']
+        for post in context['page_obj']:
+            tags += cache.get_post_cache_tags(post)
+        return tags
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, count_cache_key=self.get_count_cache_key(), **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Срок кэша карточек для {% cache %} в includes/post_card.html.
+        context['card_cache_timeout'] = POST_CARD_CACHE_TIMEOUT
+        return context
+
+    def use_cursor_pagination(self):
+        if self.cursor_pagination is None:
+            return getattr(settings, 'BLOG_CURSOR_PAGINATION', False)
+        return self.cursor_pagination
+
+    def get_validator_queryset(self):
+        queryset = self.get_queryset()
+        if self.use_cursor_pagination():
+            return CursorPaginator(
+                queryset, self.paginate_by
+            ).get_page_queryset(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        try:
+            number = int(self.request.GET.get('page') or 1)
+        except ValueError:
+            return None
+        if number < 1:
+            return None
+        offset = (number - 1) * self.paginate_by
+        return queryset[offset:offset + self.paginate_by + 1]
+
+    def get_validator_extra(self):
+        if self.use_cursor_pagination():
+            return ()
+        # Число страниц видно в пагинаторе; обычно берётся из кэша.
+        paginator = self.get_paginator(self.get_queryset(), self.paginate_by)
+        return (paginator.count,)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        page = paginator.page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
 
 
 class PostCreateMixin:
@@ -60,6 +346,9 @@ class CommentMixin(RedirectionPostMixin):
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
+    def get_queryset(self):
+        return super().get_queryset().filter(post_id=self.kwargs['post_id'])
+
 
 class CommentFormMixin(CommentMixin):
     form_class = CommentForm
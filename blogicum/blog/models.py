@@ -1,8 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
-from . import constants
+from . import constants, images
 
 
 User = get_user_model()
@@ -21,7 +22,14 @@ class PublishedModel(models.Model):
         ordering = ('created_at', )
 
 
-class Location(PublishedModel):
+class UpdatedModel(models.Model):
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class Location(PublishedModel, UpdatedModel):
     name = models.CharField(
         'Название места', max_length=constants.MAX_FIELD_LENGTH)
 
@@ -33,7 +41,7 @@ class Location(PublishedModel):
         return self.name[:constants.REPRESENTATION_LENGTH]
 
 
-class Category(PublishedModel):
+class Category(PublishedModel, UpdatedModel):
     title = models.CharField(
         'Заголовок', max_length=constants.MAX_FIELD_LENGTH)
     description = models.TextField('Описание')
@@ -56,7 +64,33 @@ class Category(PublishedModel):
         return self.title[:constants.REPRESENTATION_LENGTH]
 
 
-class Post(PublishedModel):
+class PostQuerySet(models.QuerySet):
+    """Наборы публикаций под конкретные страницы.
+
+    Методы комбинируются: visible() только фильтрует, а for_feed()
+    и for_detail() только добавляют нужные странице JOIN и сортировку.
+    """
+
+    def visible(self):
+        """Публикации, которые видны в ленте любому посетителю."""
+        return self.filter(is_public=True, pub_date__lte=timezone.now())
+
+    def viewable_by(self, user):
+        """Видимые публикации и все публикации самого пользователя."""
+        if user.is_authenticated:
+            return self.visible() | self.filter(author=user)
+        return self.visible()
+
+    def for_feed(self):
+        return self.select_related(
+            'author', 'location', 'category'
+        ).order_by('-pub_date')
+
+    def for_detail(self):
+        return self.select_related('author', 'location', 'category')
+
+
+class Post(PublishedModel, UpdatedModel):
     title = models.CharField(
         'Заголовок', max_length=constants.MAX_FIELD_LENGTH)
     text = models.TextField('Текст')
@@ -83,18 +117,103 @@ class Post(PublishedModel):
         upload_to='post_images/',
         blank=True,
     )
+    image_meta = models.JSONField(
+        'Размеры и варианты изображения',
+        default=dict,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    is_public = models.BooleanField(
+        'Виден в ленте',
+        default=False,
+        editable=False,
+        help_text='Опубликованы и пост, и его категория.'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta(PublishedModel.Meta):
         default_related_name = 'posts'
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date', ) + PublishedModel.Meta.ordering
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_public=True),
+                name='post_public_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:constants.REPRESENTATION_LENGTH]
 
     def get_absolute_url(self):
-        return reverse('post_detail', args=(self.id,))
+        return reverse('blog:post_detail', args=(self.id,))
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None
+                or {'is_published', 'category'} & set(update_fields)):
+            self.is_public = self.get_is_public()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'is_public'}
+        super().save(*args, **kwargs)
+
+    def get_is_public(self) -> bool:
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+        )
+
+    @property
+    def image_card(self):
+        """Вариант изображения для карточки или сам оригинал."""
+        variant = images.get_variant(self.image_meta, 'card')
+        if variant is None:
+            return {
+                'url': self.image.url,
+                'width': self.image_meta.get('width'),
+                'height': self.image_meta.get('height'),
+            }
+        return {**variant, 'url': images.get_variant_url(variant)}
+
+    @property
+    def image_srcset(self):
+        return images.get_srcset(self.image_meta)
+
+    @property
+    def image_webp_srcset(self):
+        return images.get_srcset(self.image_meta, 'webp')
+
+    @property
+    def card_cache_version(self):
+        """Версия карточки поста для кэша фрагментов.
+
+        Меняется при любом изменении данных, которые выводит карточка:
+        самого поста, счётчика комментариев, категории, места и автора.
+        """
+        location = self.location
+        return (
+            self.updated_at.timestamp(),
+            self.comment_count,
+            self.category.updated_at.timestamp() if self.category else None,
+            location.updated_at.timestamp() if location else None,
+            self.author.username,
+        )
 
 
 class Comment(PublishedModel):
@@ -115,6 +234,47 @@ class Comment(PublishedModel):
     class Meta(PublishedModel.Meta):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_id_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return f'{self.author}: {self.text[:constants.COMMENT_PREVIEW_LENGTH]}'
+
+
+class Task(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        FAILED = 'failed', 'Ошибка'
+
+    name = models.CharField('Задача', max_length=constants.MAX_FIELD_LENGTH)
+    payload = models.JSONField('Аргументы', default=dict)
+    status = models.CharField(
+        'Состояние',
+        max_length=constants.TASK_STATUS_LENGTH,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    run_after = models.DateTimeField('Запустить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='task_status_run_after_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.get_status_display()})'
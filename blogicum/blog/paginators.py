@@ -0,0 +1,205 @@
+import base64
+import json
+from types import SimpleNamespace
+from typing import Any, List, Optional, Sequence
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from .constants import (
+    FEED_COUNT_CACHE_TIMEOUT, PAGE_RANGE_ON_EACH_SIDE, PAGE_RANGE_ON_ENDS
+)
+from .scheduling import get_cache_horizon
+
+
+class InvalidCursor(Http404):
+    """Курсор не разбирается: на страницах это 404, в API - 400."""
+
+
+class WindowedPage(Page):
+
+    @property
+    def elided_page_range(self):
+        """Номера страниц вокруг текущей и по краям, без полного списка."""
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+            on_ends=PAGE_RANGE_ON_ENDS,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт общее число объектов из кэша.
+
+    Счётчик приблизительный: он сбрасывается при изменении публикаций,
+    а в остальном живёт не дольше FEED_COUNT_CACHE_TIMEOUT и не дольше,
+    чем до ближайшей отложенной публикации.
+    """
+
+    def __init__(self, *args, count_cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = super().count
+            timeout = get_cache_horizon(FEED_COUNT_CACHE_TIMEOUT)
+            if timeout > 0:
+                cache.set(self.count_cache_key, count, timeout)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class CursorPage(Sequence):
+    """Страница ленты, построенная по курсору, а не по номеру."""
+
+    is_cursor = True
+
+    def __init__(
+        self,
+        object_list: List[Any],
+        paginator: 'CursorPaginator',
+        next_cursor: Optional[str] = None,
+        previous_cursor: Optional[str] = None,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по упорядоченной паре полей.
+
+    Вместо OFFSET и COUNT(*) страница выбирается условием
+    ``(pub_date, id) < (последнее значение на странице)``,
+    поэтому стоимость запроса не зависит от глубины страницы.
+    Последнее поле в ``ordering`` должно быть уникальным.
+    """
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        per_page: int,
+        ordering: Sequence[str] = ('-pub_date', '-pk'),
+    ):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+        self.descending = self.ordering[0].startswith('-')
+
+    def encode_cursor(self, obj: Any) -> str:
+        if isinstance(obj, dict):
+            # Строка из values(): ключи - имена полей из ordering.
+            obj = SimpleNamespace(**{
+                self._field(name).attname: obj[name] for name in self.fields
+            })
+        values = [
+            self._field(name).value_to_string(obj) for name in self.fields
+        ]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise InvalidCursor('Неверный курсор страницы.')
+
+    def _field(self, name: str):
+        model = self.queryset.model
+        if name == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(name)
+
+    def _keyset_filter(self, values: List[Any], forward: bool) -> Q:
+        # forward - в направлении сортировки, иначе - в обратном.
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.fields, values):
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_page_queryset(
+        self, after: Optional[str] = None, before: Optional[str] = None
+    ) -> QuerySet:
+        """Срез страницы и одна строка сверх неё для has_next."""
+        queryset = self.queryset
+        if before:
+            queryset = queryset.filter(
+                self._keyset_filter(self.decode_cursor(before), False)
+            ).order_by(*self._reversed_ordering())
+        else:
+            if after:
+                queryset = queryset.filter(
+                    self._keyset_filter(self.decode_cursor(after), True)
+                )
+            queryset = queryset.order_by(*self.ordering)
+        return queryset[:self.per_page + 1]
+
+    def page(
+        self, after: Optional[str] = None, before: Optional[str] = None
+    ) -> CursorPage:
+        object_list = list(self.get_page_queryset(after, before))
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if before:
+            object_list.reverse()
+
+        has_next = bool(before) or has_more
+        has_previous = bool(after) or (bool(before) and has_more)
+        return CursorPage(
+            object_list,
+            self,
+            next_cursor=(
+                self.encode_cursor(object_list[-1])
+                if has_next and object_list else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(object_list[0])
+                if has_previous and object_list else None
+            ),
+        )
+
+    def _reversed_ordering(self) -> tuple:
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
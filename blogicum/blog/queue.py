@@ -0,0 +1,99 @@
+"""Очередь фоновых задач в базе данных, без внешнего брокера.
+
+Задача - функция, зарегистрированная декоратором @task под именем
+``модуль.имя``. Её вызов откладывается через enqueue(): в таблицу
+blog_task пишется строка в текущей транзакции. Чтобы задача
+закоммитилась вместе с изменениями, ради которых она ставится,
+вызывающий код оборачивает их в transaction.atomic (как
+PostFormMixin.form_valid; админка делает это сама).
+Задачи выполняет команда ``manage.py run_worker``.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .constants import (
+    TASK_BATCH_SIZE, TASK_LOCK_TIMEOUT, TASK_MAX_ATTEMPTS, TASK_RETRY_DELAY
+)
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def get_task_name(func) -> str:
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def task(func):
+    registry[get_task_name(func)] = func
+    return func
+
+
+def enqueue(func, **payload):
+    """Ставит задачу в очередь; в режиме BLOG_TASKS_EAGER - выполняет."""
+    if getattr(settings, 'BLOG_TASKS_EAGER', False):
+        func(**payload)
+        return None
+    return Task.objects.create(name=get_task_name(func), payload=payload)
+
+
+def claim_tasks(limit: int = TASK_BATCH_SIZE) -> list:
+    """Забирает готовые к запуску задачи, не занятые другим воркером."""
+    now = timezone.now()
+    available = (
+        Q(status=Task.Status.PENDING)
+        | Q(
+            status=Task.Status.RUNNING,
+            locked_at__lt=now - timedelta(seconds=TASK_LOCK_TIMEOUT),
+        )
+    )
+    claimed = []
+    candidates = Task.objects.filter(
+        available, run_after__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    for pk in candidates:
+        # Условный UPDATE: если задачу уже забрал другой воркер,
+        # ни одна строка не изменится.
+        if Task.objects.filter(available, pk=pk).update(
+            status=Task.Status.RUNNING, locked_at=now
+        ):
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def run_task(task_obj: Task) -> bool:
+    func = registry.get(task_obj.name)
+    try:
+        if func is None:
+            raise LookupError(f'Неизвестная задача {task_obj.name}')
+        func(**task_obj.payload)
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', task_obj)
+        task_obj.attempts += 1
+        task_obj.last_error = traceback.format_exc()
+        task_obj.locked_at = None
+        if task_obj.attempts >= TASK_MAX_ATTEMPTS:
+            task_obj.status = Task.Status.FAILED
+        else:
+            task_obj.status = Task.Status.PENDING
+            task_obj.run_after = timezone.now() + timedelta(
+                seconds=TASK_RETRY_DELAY * 2 ** (task_obj.attempts - 1)
+            )
+        task_obj.save()
+        return False
+    task_obj.delete()
+    return True
+
+
+def run_pending(limit: int = TASK_BATCH_SIZE) -> int:
+    """Выполняет пачку задач и возвращает число обработанных."""
+    tasks = claim_tasks(limit)
+    for task_obj in tasks:
+        run_task(task_obj)
+    return len(tasks)
@@ -0,0 +1,30 @@
+"""Маршрутизация чтения на реплики базы данных.
+
+Реплики из settings.BLOG_REPLICA_DATABASES используются только внутри
+запросов, помеченных ReplicaRoutingMiddleware; всё остальное, включая
+любую запись, идёт в основную базу default.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'BLOG_REPLICA_DATABASES', ())
+        if replicas and read_from_replica.get():
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
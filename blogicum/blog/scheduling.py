@@ -0,0 +1,49 @@
+"""Учёт отложенных публикаций для сроков жизни кэша лент.
+
+Лента фильтруется по ``pub_date__lte=timezone.now()``, поэтому любой
+её кэш устаревает в момент, когда наступает дата ближайшей отложенной
+публикации. Эта дата хранится в кэше и сбрасывается при изменении
+публикаций.
+"""
+from datetime import datetime
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .constants import NEXT_PUBLICATION_CACHE_TIMEOUT
+from .models import Post
+
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+
+
+def get_next_publication() -> Optional[datetime]:
+    """Дата ближайшей публикации, которая ещё не видна в ленте."""
+    now = timezone.now()
+    cached = cache.get(NEXT_PUBLICATION_KEY)
+    if cached is not None:
+        next_pub_date, = cached
+        if next_pub_date is None or next_pub_date > now:
+            return next_pub_date
+
+    next_pub_date = Post.objects.filter(
+        is_public=True, pub_date__gt=now
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    cache.set(
+        NEXT_PUBLICATION_KEY, (next_pub_date,), NEXT_PUBLICATION_CACHE_TIMEOUT
+    )
+    return next_pub_date
+
+
+def reset_next_publication() -> None:
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def get_cache_horizon(timeout: int) -> int:
+    """Срок кэширования ленты, не выходящий за ближайшую публикацию."""
+    next_pub_date = get_next_publication()
+    if next_pub_date is None:
+        return timeout
+    delay = (next_pub_date - timezone.now()).total_seconds()
+    return max(0, min(timeout, int(delay)))
@@ -0,0 +1,141 @@
+"""Полнотекстовый поиск по заголовку и тексту публикаций.
+
+Бэкенд выбирается по СУБД: для SQLite - таблица FTS5 со словами,
+приведёнными к основе русским стеммером Snowball; для PostgreSQL -
+to_tsvector с конфигурацией 'russian' и GIN-индексом по тому же
+выражению (см. миграцию 0012_post_search).
+"""
+import re
+from functools import lru_cache
+from typing import Iterable
+
+import snowballstemmer
+from django.db import connection
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .constants import SEARCH_INDEX_CHUNK_SIZE, SEARCH_MAX_RESULTS
+from .models import Post
+
+WORD_RE = re.compile(r'\w+')
+stemmer = snowballstemmer.stemmer('russian')
+
+
+@lru_cache(maxsize=100_000)
+def stem_word(word: str) -> str:
+    # Словарь текстов небольшой, а стемминг - самая дорогая часть
+    # индексации, поэтому основы слов запоминаются.
+    return stemmer.stemWord(word)
+
+
+def stem_words(text: str) -> list:
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return [stem_word(word) for word in words]
+
+
+class SqliteSearchBackend:
+    table = 'blog_post_fts'
+
+    def build_match(self, query: str) -> str:
+        # Каждая основа - отдельный префиксный терм, термы через AND.
+        return ' '.join(f'"{stem}"*' for stem in stem_words(query))
+
+    def get_match_sql(self, match: str):
+        """Лучшие по rank совпадения среди видимых публикаций.
+
+        Видимость (как в PostQuerySet.visible()) проверяется в JOIN
+        по первичному ключу: так лимит берётся только по видимым
+        постам, а FTS5 по-прежнему отдаёт строки в порядке rank.
+        """
+        return (
+            f'SELECT f.rowid FROM {self.table} f '
+            f'JOIN {Post._meta.db_table} p ON p.id = f.rowid '
+            f'WHERE f.{self.table} MATCH %s '
+            'AND p.is_public AND p.pub_date <= %s '
+            'ORDER BY f.rank LIMIT %s',
+            (
+                match,
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+                SEARCH_MAX_RESULTS,
+            ),
+        )
+
+    def filter(self, queryset: QuerySet, query: str) -> QuerySet:
+        match = self.build_match(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(*self.get_match_sql(match)))
+
+    def index(self, posts: Iterable) -> None:
+        rows = [
+            (post.pk, ' '.join(stem_words(f'{post.title} {post.text}')))
+            for post in posts
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk, _ in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, content) VALUES (%s, %s)',
+                rows,
+            )
+
+    def remove(self, post_ids: Iterable[int]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk in post_ids],
+            )
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+
+class PostgresSearchBackend:
+    """Индекс строится самой СУБД, поэтому обновлять его не нужно."""
+
+    config = 'russian'
+
+    def filter(self, queryset: QuerySet, query: str) -> QuerySet:
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        if not query.strip():
+            return queryset.none()
+        return queryset.annotate(
+            search=SearchVector('title', 'text', config=self.config)
+        ).filter(search=SearchQuery(query, config=self.config))
+
+    def index(self, posts: Iterable) -> None:
+        pass
+
+    def remove(self, post_ids: Iterable[int]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return SqliteSearchBackend()
+
+
+def rebuild_index() -> int:
+    """Заново индексирует все публикации и возвращает их число."""
+    backend = get_search_backend()
+    backend.clear()
+    chunk = []
+    indexed = 0
+    posts = Post.objects.only('pk', 'title', 'text').order_by()
+    for post in posts.iterator(chunk_size=SEARCH_INDEX_CHUNK_SIZE):
+        chunk.append(post)
+        if len(chunk) == SEARCH_INDEX_CHUNK_SIZE:
+            backend.index(chunk)
+            indexed += len(chunk)
+            chunk = []
+    backend.index(chunk)
+    return indexed + len(chunk)
@@ -0,0 +1,252 @@
+"""Генератор синтетических данных для нагрузочных замеров.
+
+Все значения берутся из random.Random(seed), поэтому при одинаковых
+параметрах получается одинаковый набор данных. Строки вставляются
+через bulk_create пачками, сигналы моделей при этом не вызываются:
+is_public и comment_count вычисляются здесь же, а поисковый индекс
+и кэш лент обновляются в конце (reset_caches).
+
+Распределения по умолчанию (DISTRIBUTION) приближены к живому блогу:
+немногие авторы пишут большую часть постов, немногие посты собирают
+значительную часть комментариев, часть постов отложена на будущее,
+часть категорий снята с публикации.
+"""
+import random
+from itertools import islice
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_all_feed_counts, invalidate_tags
+from .constants import SEED_BATCH_SIZE
+from .models import Category, Comment, Location, Post, User
+from .scheduling import reset_next_publication
+from .search import rebuild_index
+
+DISTRIBUTION = {
+    # Доля «популярных» авторов и доля постов, которые они пишут.
+    'hot_author_share': 0.01,
+    'hot_author_posts': 0.5,
+    # Доля «вирусных» постов и доля комментариев, которые они собирают.
+    'viral_post_share': 0.001,
+    'viral_post_comments': 0.3,
+    'future_post_share': 0.02,
+    'unpublished_post_share': 0.03,
+    'unpublished_category_share': 0.1,
+}
+
+WORDS = (
+    'город', 'дорога', 'лес', 'река', 'утро', 'вечер', 'поезд', 'книга',
+    'музей', 'кофе', 'море', 'горы', 'снег', 'дождь', 'солнце', 'парк',
+    'мост', 'улица', 'окно', 'сад', 'путь', 'друг', 'время', 'история',
+    'фотография', 'прогулка', 'неделя', 'праздник', 'рынок', 'театр',
+)
+
+
+def reset_caches() -> None:
+    """Сбрасывает то, что обычно обновляют сигналы моделей.
+
+    bulk_create и DELETE в обход ORM сигналы не вызывают, поэтому
+    после них поисковый индекс, счётчики лент и кэш страниц
+    приводятся в порядок здесь.
+    """
+    rebuild_index()
+    invalidate_all_feed_counts()
+    invalidate_tags('feed')
+    reset_next_publication()
+
+
+class Seeder:
+
+    def __init__(
+        self, seed: int = 0, batch_size: int = SEED_BATCH_SIZE,
+        log=None, **distribution,
+    ):
+        unknown = set(distribution) - set(DISTRIBUTION)
+        if unknown:
+            raise ValueError(f'Неизвестные параметры: {", ".join(unknown)}')
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.distribution = {**DISTRIBUTION, **distribution}
+        self.now = timezone.now()
+
+    def chance(self, name: str) -> bool:
+        return self.random.random() < self.distribution[name]
+
+    def choose_skewed(self, items, hot_share: str, hot_weight: str):
+        """Случайный элемент с перекосом к началу списка.
+
+        Первые hot_share элементов выпадают с суммарной вероятностью
+        hot_weight, остальные - равномерно.
+        """
+        hot = max(1, int(len(items) * self.distribution[hot_share]))
+        if hot < len(items) and not self.chance(hot_weight):
+            return items[self.random.randrange(hot, len(items))]
+        return items[self.random.randrange(hot)]
+
+    def next_number(self, model) -> int:
+        last = model.objects.order_by('-pk').values_list('pk', flat=True)
+        return (last.first() or 0) + 1
+
+    def words(self, count: int) -> str:
+        return ' '.join(self.random.choices(WORDS, k=count))
+
+    def bulk_create(self, model, objects) -> None:
+        """Вставляет объекты из генератора пачками по batch_size.
+
+        bulk_create сам превращает переданное в список, так что
+        генератор режется здесь: в памяти не больше одной пачки.
+        """
+        objects = iter(objects)
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+
+    def insert(self, model, objects) -> list:
+        """Вставляет объекты пачками и возвращает id новых строк по порядку.
+
+        SQLite в Django 3.2 не возвращает id из bulk_create, поэтому
+        они выбираются после вставки: новые строки получают id больше
+        прежнего максимума.
+        """
+        last_id = self.next_number(model) - 1
+        self.bulk_create(model, objects)
+        return list(
+            model.objects.filter(pk__gt=last_id)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def create_users(self, count: int) -> list:
+        password = make_password(None)
+        start = self.next_number(User)
+        return self.insert(User, (
+            User(
+                username=f'seed_user_{number}',
+                first_name=self.words(1).title(),
+                password=password,
+            )
+            for number in range(start, start + count)
+        ))
+
+    def create_categories(self, count: int) -> dict:
+        """Возвращает {id категории: опубликована ли она}."""
+        start = self.next_number(Category)
+        # Первая категория всегда опубликована, чтобы ленты не пустовали.
+        published = [True] + [
+            not self.chance('unpublished_category_share')
+            for _ in range(count - 1)
+        ]
+        ids = self.insert(Category, (
+            Category(
+                title=self.words(2).capitalize(),
+                description=self.words(12),
+                slug=f'seed-category-{number}',
+                is_published=is_published,
+            )
+            for number, is_published in zip(
+                range(start, start + count), published
+            )
+        ))
+        return dict(zip(ids, published))
+
+    def create_locations(self, count: int) -> list:
+        return self.insert(Location, (
+            Location(name=self.words(1).title()) for _ in range(count)
+        ))
+
+    def build_post(
+        self, author_ids, category_ids, categories, location_ids, comments
+    ):
+        category_id = self.random.choice(category_ids)
+        is_published = not self.chance('unpublished_post_share')
+        minutes = self.random.randint(0, 2 * 365 * 24 * 60)
+        if self.chance('future_post_share'):
+            minutes = -self.random.randint(1, 30 * 24 * 60)
+        return Post(
+            title=self.words(4).capitalize(),
+            text=self.words(self.random.randint(20, 80)),
+            pub_date=self.now - timedelta(minutes=minutes),
+            author_id=self.choose_skewed(
+                author_ids, 'hot_author_share', 'hot_author_posts'
+            ),
+            category_id=category_id,
+            location_id=self.random.choice(location_ids),
+            is_published=is_published,
+            is_public=is_published and categories[category_id],
+            comment_count=comments,
+        )
+
+    def create_posts(
+        self, count: int, author_ids, categories, location_ids,
+        comment_counts,
+    ) -> list:
+        category_ids = tuple(categories)
+        return self.insert(Post, (
+            self.build_post(
+                author_ids, category_ids, categories, location_ids,
+                comment_counts[number],
+            )
+            for number in range(count)
+        ))
+
+    def create_comments(self, post_ids, comment_counts, author_ids) -> None:
+        self.bulk_create(Comment, (
+            Comment(
+                post_id=post_id,
+                author_id=self.random.choice(author_ids),
+                text=self.words(self.random.randint(3, 15)),
+            )
+            for post_id, count in zip(post_ids, comment_counts)
+            for _ in range(count)
+        ))
+
+    def get_comment_counts(self, posts: int, comments: int) -> list:
+        counts = [0] * posts
+        if not posts:
+            return counts
+        # «Вирусные» посты разбросаны по ленте, а не идут первыми.
+        order = list(range(posts))
+        self.random.shuffle(order)
+        for _ in range(comments):
+            counts[self.choose_skewed(
+                order, 'viral_post_share', 'viral_post_comments'
+            )] += 1
+        return counts
+
+    def seed(
+        self, posts: int, users: int = None, categories: int = None,
+        locations: int = None, comments: int = None,
+    ) -> dict:
+        users = users or max(10, posts // 20)
+        categories = categories or max(5, posts // 2000)
+        locations = locations or max(5, posts // 1000)
+        comments = posts * 2 if comments is None else comments
+
+        with transaction.atomic():
+            self.log(f'Пользователи: {users}')
+            author_ids = self.create_users(users)
+            self.log(f'Категории: {categories}, местоположения: {locations}')
+            category_ids = self.create_categories(categories)
+            location_ids = self.create_locations(locations)
+            comment_counts = self.get_comment_counts(posts, comments)
+            self.log(f'Публикации: {posts}')
+            post_ids = self.create_posts(
+                posts, author_ids, category_ids, location_ids,
+                comment_counts,
+            )
+            self.log(f'Комментарии: {comments}')
+            self.create_comments(post_ids, comment_counts, author_ids)
+        self.log('Поисковый индекс и кэш')
+        reset_caches()
+        return {
+            'users': users,
+            'categories': categories,
+            'locations': locations,
+            'posts': posts,
+            'comments': comments,
+        }
@@ -1,22 +1,63 @@
-from django.db.models import QuerySet, Count
+from django.db.models import Count, F, Max, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from .models import Post
+from .cache import invalidate_tags
+from .models import Category, Comment, Post
 
 
-def get_general_posts_filter(
-    queryset: QuerySet = Post.objects.all(),
-    apply_filters: bool = True
-) -> QuerySet:
-    if apply_filters:
-        queryset = queryset.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
+def get_broken_comment_counters(queryset: QuerySet = None) -> QuerySet:
+    """Посты, у которых сохранённый счётчик не совпадает с реальным."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    actual_count = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(
+        count=Count('pk')
+    ).values('count')
+    return queryset.annotate(
+        actual_comment_count=Coalesce(Subquery(actual_count), 0)
+    ).exclude(comment_count=F('actual_comment_count'))
+
+
+def recount_comments(queryset: QuerySet = None) -> int:
+    """Пересчитывает счётчики комментариев и возвращает число исправлений."""
+    broken = get_broken_comment_counters(queryset)
+    fixed = 0
+    for post_id, actual in broken.values_list(
+        'pk', 'actual_comment_count'
+    ).iterator():
+        # Счётчик выводится на странице поста: её версия и кэш меняются.
+        fixed += Post.objects.filter(pk=post_id).update(
+            comment_count=actual, updated_at=timezone.now()
         )
+        invalidate_tags(f'post:{post_id}')
+    return fixed
 
-    queryset = queryset.select_related('category').annotate(
-        comment_count=Count('comments')
-    ).order_by('-pub_date')
 
-    return queryset
+def sync_category_posts_visibility(category: Category) -> int:
+    """Пересчитывает is_public у постов категории одним-двумя UPDATE."""
+    posts = Post.objects.filter(category=category)
+    if not category.is_published:
+        return posts.filter(is_public=True).update(is_public=False)
+    return (
+        posts.filter(is_published=True, is_public=False).update(
+            is_public=True
+        )
+        + posts.filter(is_published=False, is_public=True).update(
+            is_public=False
+        )
+    )
+
+
+def repair_posts_visibility(chunk_size: int):
+    """Исправляет is_public диапазонами id, отдаёт (последний id, число)."""
+    public = Q(is_published=True, category__is_published=True)
+    last_id = Post.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+    for start in range(0, last_id + 1, chunk_size):
+        chunk = Post.objects.filter(pk__gte=start, pk__lt=start + chunk_size)
+        fixed = chunk.filter(public, is_public=False).update(is_public=True)
+        fixed += chunk.exclude(public).filter(is_public=True).update(
+            is_public=False
+        )
+        yield min(start + chunk_size - 1, last_id), fixed
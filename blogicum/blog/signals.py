@@ -0,0 +1,219 @@
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    get_post_cache_tags, invalidate_all_feed_counts, invalidate_feed_counts,
+    invalidate_tags
+)
+from .images import delete_variants
+from .models import Category, Comment, Location, Post, User
+from .scheduling import reset_next_publication
+from .search import get_search_backend
+from .service import sync_category_posts_visibility
+
+
+# Комментарии показываются на странице поста, поэтому любое их
+# изменение сдвигает Post.updated_at - версию страницы для ETag.
+
+# Посты, удаляемые в текущем потоке: их комментарии удаляются каскадом,
+# и обновлять счётчик и кэш удаляемого поста на каждый из них незачем.
+deleting_posts = threading.local()
+
+
+def get_deleting_post_ids() -> set:
+    if not hasattr(deleting_posts, 'ids'):
+        deleting_posts.ids = set()
+    return deleting_posts.ids
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleting_post(sender, instance, **kwargs):
+    get_deleting_post_ids().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleting_post(sender, instance, **kwargs):
+    get_deleting_post_ids().discard(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    if instance.post_id in get_deleting_post_ids():
+        return
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0),
+        updated_at=timezone.now(),
+    )
+
+
+# Пост, перенесённый в другую категорию или к другому автору, меняет
+# счётчики и прежних лент.
+FEED_FIELDS = ('category_id', 'author_id')
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (
+        update_fields and not {'category', 'author'} & set(update_fields)
+    ):
+        return
+    instance._previous_feeds = Post.objects.filter(
+        pk=instance.pk
+    ).values_list(*FEED_FIELDS).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_feed_counts(sender, instance, **kwargs):
+    previous = instance.__dict__.pop('_previous_feeds', None)
+    category_id, author_id = previous or (None, None)
+    invalidate_feed_counts(
+        category_ids={instance.category_id, category_id},
+        author_ids={instance.author_id, author_id} - {None},
+    )
+
+
+# is_public меняется массово, а по нему ищется ближайшая публикация.
+
+@receiver(post_save, sender=Category)
+def sync_posts_visibility(sender, instance, **kwargs):
+    if sync_category_posts_visibility(instance):
+        reset_next_publication()
+
+
+@receiver(post_save, sender=Post)
+def sync_raw_post_visibility(sender, instance, raw, **kwargs):
+    # loaddata сохраняет строки в обход Post.save(), is_public не считается.
+    if not raw:
+        return
+    is_public = instance.is_published and Category.objects.filter(
+        pk=instance.category_id, is_published=True
+    ).exists()
+    if is_public != instance.is_public:
+        Post.objects.filter(pk=instance.pk).update(is_public=is_public)
+        instance.is_public = is_public
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    # Посты останутся без категории (SET_NULL) и пропадут из ленты.
+    if instance.posts.update(is_public=False):
+        reset_next_publication()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_all_feed_counts(sender, instance, **kwargs):
+    # Снятие категории с публикации меняет счётчики всех лент.
+    invalidate_all_feed_counts()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_pages(sender, instance, **kwargs):
+    invalidate_tags('feed', *get_post_cache_tags(instance))
+    reset_next_publication()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_category_pages(sender, instance, **kwargs):
+    invalidate_tags('feed', f'category:{instance.pk}')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_location_pages(sender, instance, **kwargs):
+    invalidate_tags(f'location:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_comment_pages(sender, instance, **kwargs):
+    if instance.post_id in get_deleting_post_ids():
+        # Страницы поста сбросит reset_post_pages.
+        return
+    invalidate_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_author_pages(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login - страницы не меняются.
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    invalidate_tags(f'author:{instance.pk}')
+
+
+# Имена выводятся в карточках постов и в комментариях на странице поста.
+USER_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=User)
+def remember_user_names(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (
+        update_fields and not set(update_fields) & set(USER_NAME_FIELDS)
+    ):
+        return
+    instance._previous_names = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*USER_NAME_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def touch_author_posts(sender, instance, created, **kwargs):
+    # Смена пароля, почты или входа не трогает посты автора.
+    previous = instance.__dict__.pop('_previous_names', None)
+    current = tuple(getattr(instance, name) for name in USER_NAME_FIELDS)
+    if created or previous is None or previous == current:
+        return
+    now = timezone.now()
+    instance.posts.update(updated_at=now)
+    Post.objects.filter(comments__author=instance).update(updated_at=now)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    get_search_backend().index((instance,))
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove((instance.pk,))
+
+
+@receiver(post_delete, sender=Post)
+def delete_image_variants(sender, instance, **kwargs):
+    # Файлы удаляются только после коммита: при откате пост вернётся.
+    meta = instance.image_meta
+    transaction.on_commit(lambda: delete_variants(meta))
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'BLOG_SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,195 @@
+"""Карта сайта из статических файлов, разбитых на сегменты.
+
+Посты и профили делятся на сегменты по диапазонам id размером
+SITEMAP_SEGMENT_SIZE; категории умещаются в один файл. Для каждого
+сегмента одним GROUP BY-запросом считается подпись: число строк,
+сумма id и последний updated_at. Подписи хранятся в manifest.json,
+и при обновлении перезаписываются только сегменты, подпись которых
+изменилась. Строки сегмента читаются через iterator().
+"""
+import json
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Max
+from django.db.models import Q, Sum
+from django.urls import reverse
+
+from .constants import SITEMAP_SEGMENT_SIZE
+from .models import Category, Post
+
+MANIFEST_NAME = 'manifest.json'
+INDEX_NAME = 'sitemap.xml'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def absolute_url(path: str) -> str:
+    return settings.BLOG_SITE_URL.rstrip('/') + path
+
+
+def url_entry(path: str, lastmod) -> str:
+    return (
+        f'<url><loc>{escape(absolute_url(path))}</loc>'
+        f'<lastmod>{lastmod.isoformat()}</lastmod></url>\n'
+    )
+
+
+def segment_of(field: str):
+    return ExpressionWrapper(
+        (F(field) - 1) / SITEMAP_SEGMENT_SIZE, output_field=IntegerField()
+    )
+
+
+class SitemapBuilder:
+
+    def __init__(self, root=None):
+        self.root = Path(root or settings.BLOG_SITEMAP_ROOT)
+        self.manifest_path = self.root / MANIFEST_NAME
+
+    def load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        return json.loads(self.manifest_path.read_text())
+
+    def get_post_signatures(self) -> dict:
+        return self.get_signatures(
+            Post.objects.visible(), 'pk', 'updated_at'
+        )
+
+    def get_profile_signatures(self) -> dict:
+        # Профиль попадает в карту, если у автора есть видимые посты.
+        return self.get_signatures(
+            Post.objects.visible(), 'author_id', 'updated_at', distinct=True
+        )
+
+    def get_signatures(self, queryset, id_field, date_field, distinct=False):
+        rows = queryset.annotate(segment=segment_of(id_field)).values(
+            'segment'
+        ).annotate(
+            count=Count(id_field, distinct=distinct),
+            checksum=Sum(id_field, distinct=distinct),
+            lastmod=Max(date_field),
+        ).order_by()
+        return {
+            str(row['segment']): [
+                row['count'], row['checksum'], row['lastmod'].isoformat()
+            ]
+            for row in rows
+        }
+
+    def segment_range(self, segment: str):
+        start = int(segment) * SITEMAP_SEGMENT_SIZE + 1
+        return start, start + SITEMAP_SEGMENT_SIZE - 1
+
+    def write_posts_segment(self, segment: str) -> None:
+        posts = Post.objects.visible().filter(
+            pk__range=self.segment_range(segment)
+        ).order_by('pk').values_list('pk', 'updated_at')
+        self.write_urlset(f'posts-{segment}.xml', (
+            url_entry(reverse('blog:post_detail', args=(pk,)), updated_at)
+            for pk, updated_at in posts.iterator()
+        ))
+
+    def write_profiles_segment(self, segment: str) -> None:
+        start, end = self.segment_range(segment)
+        authors = Post.objects.visible().filter(
+            author__gte=start, author__lte=end
+        ).values('author__username').annotate(
+            lastmod=Max('updated_at')
+        ).order_by('author_id')
+        self.write_urlset(f'profiles-{segment}.xml', (
+            url_entry(
+                reverse('blog:profile', args=(row['author__username'],)),
+                row['lastmod'],
+            )
+            for row in authors.iterator()
+        ))
+
+    def write_categories(self) -> str:
+        """Пишет карту категорий и возвращает её lastmod."""
+        categories = Category.objects.filter(is_published=True).annotate(
+            lastmod=Max(
+                'posts__updated_at',
+                filter=Q(posts__in=Post.objects.visible()),
+            )
+        ).order_by('pk')
+        lastmod = None
+        entries = []
+        for category in categories.iterator():
+            date = max(filter(None, (category.updated_at, category.lastmod)))
+            lastmod = max(filter(None, (lastmod, date)))
+            entries.append(url_entry(
+                reverse('blog:category_posts', args=(category.slug,)), date
+            ))
+        self.write_urlset('categories.xml', entries)
+        return lastmod.isoformat() if lastmod else None
+
+    def write_urlset(self, name: str, entries) -> None:
+        path = self.root / name
+        temporary = path.with_suffix('.tmp')
+        with temporary.open('w', encoding='utf-8') as file:
+            file.write(XML_HEADER)
+            file.write(f'<urlset xmlns="{XMLNS}">\n')
+            file.writelines(entries)
+            file.write('</urlset>\n')
+        # Замена файла атомарна: веб-сервер не отдаст его наполовину.
+        temporary.replace(path)
+
+    def write_index(self, manifest: dict) -> None:
+        sitemaps = [
+            (f'{kind}-{segment}.xml', signature[2])
+            for kind in ('posts', 'profiles')
+            for segment, signature in sorted(
+                manifest[kind].items(), key=lambda item: int(item[0])
+            )
+        ]
+        if manifest['categories']:
+            sitemaps.append(('categories.xml', manifest['categories']))
+        path = self.root / INDEX_NAME
+        temporary = path.with_suffix('.tmp')
+        with temporary.open('w', encoding='utf-8') as file:
+            file.write(XML_HEADER)
+            file.write(f'<sitemapindex xmlns="{XMLNS}">\n')
+            for name, lastmod in sitemaps:
+                location = escape(absolute_url(
+                    reverse('blog:sitemap_segment', kwargs={'name': name})
+                ))
+                file.write(
+                    f'<sitemap><loc>{location}</loc>'
+                    f'<lastmod>{lastmod}</lastmod></sitemap>\n'
+                )
+            file.write('</sitemapindex>\n')
+        temporary.replace(path)
+
+    def build(self, full: bool = False) -> dict:
+        """Обновляет изменившиеся сегменты; возвращает их число по видам."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        old = {} if full else self.load_manifest()
+        manifest = {
+            'posts': self.get_post_signatures(),
+            'profiles': self.get_profile_signatures(),
+        }
+        writers = {
+            'posts': self.write_posts_segment,
+            'profiles': self.write_profiles_segment,
+        }
+        written = {}
+        for kind, signatures in manifest.items():
+            previous = old.get(kind, {})
+            changed = [
+                segment for segment, signature in signatures.items()
+                if previous.get(segment) != signature
+            ]
+            for segment in changed:
+                writers[kind](segment)
+            for segment in set(previous) - set(signatures):
+                (self.root / f'{kind}-{segment}.xml').unlink(missing_ok=True)
+            written[kind] = len(changed)
+
+        manifest['categories'] = self.write_categories()
+        written['categories'] = 1
+        self.write_index(manifest)
+        self.manifest_path.write_text(json.dumps(manifest))
+        return written
@@ -0,0 +1,10 @@
+from .images import process_post_image
+from .models import Post
+from .queue import task
+
+
+@task
+def process_post_image_task(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        process_post_image(post)
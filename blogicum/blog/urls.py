@@ -1,16 +1,47 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'blog'
 
 # Основные URL-шаблоны
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('category/<slug:category_slug>/',
          views.CategoryListView.as_view(), name='category_posts'),
 ]
 
+# URL-шаблоны для RSS и Atom: feed_format - 'rss' или 'atom'
+feeds_urls = [
+    path('feeds/<str:feed_format>/',
+         feeds.LatestPostsFeed.as_view(), name='feed'),
+    path('category/<slug:category_slug>/feeds/<str:feed_format>/',
+         feeds.CategoryFeed.as_view(), name='category_feed'),
+    path('profile/<str:username>/feeds/<str:feed_format>/',
+         feeds.AuthorFeed.as_view(), name='author_feed'),
+]
+
+# Карта сайта: индекс и сегменты вида posts-0.xml, categories.xml
+sitemap_urls = [
+    path('sitemap.xml', views.SitemapView.as_view(), name='sitemap'),
+    re_path(r'^sitemaps/(?P<name>[a-z]+(?:-\d+)?\.xml)$',
+            views.SitemapView.as_view(), name='sitemap_segment'),
+]
+
+# JSON API только для чтения
+api_urls = [
+    path('posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path('posts/<int:post_id>/',
+         api.PostDetailApiView.as_view(), name='api_post_detail'),
+    path('posts/<int:post_id>/comments/',
+         api.CommentListApiView.as_view(), name='api_post_comments'),
+    path('category/<slug:category_slug>/posts/',
+         api.CategoryPostsApiView.as_view(), name='api_category_posts'),
+    path('profile/<str:username>/posts/',
+         api.ProfilePostsApiView.as_view(), name='api_profile_posts'),
+]
+
 # URL-шаблоны для постов
 posts_urls = [
     path('create/', views.PostCreateView.as_view(), name='create_post'),
@@ -26,6 +57,8 @@ posts_urls = [
 
 # URL-шаблоны для комментариев
 comments_urls = [
+    path('<int:post_id>/comments/',
+         views.CommentListView.as_view(), name='post_comments'),
     path('<int:post_id>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
     path('<int:post_id>/edit_comment/<int:comment_id>/',
@@ -43,8 +76,9 @@ profile_urls = [
 ]
 
 # Добавление всех URL-шаблонов в urlpatterns
-urlpatterns += [
+urlpatterns += feeds_urls + sitemap_urls + [
     path('posts/', include(posts_urls)),
     path('posts/', include(comments_urls)),
     path('profile/', include(profile_urls)),
+    path('api/', include(api_urls)),
 ]
@@ -1,67 +1,128 @@
 from typing import Any, Dict
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.db.models.query import QuerySet
-from django.shortcuts import get_object_or_404
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import render
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView
+    CreateView, DeleteView, DetailView, ListView, UpdateView, View
 )
 
 from . import mixins
+from .cache import get_feed_count_key, get_post_cache_tags
+from .constants import SEARCH_QUERY_LENGTH
 from .forms import CommentForm, PostForm
-from .models import Category, Post, User
-from .service import get_general_posts_filter
+from .models import Post, User
+from .search import get_search_backend
+
+
+class SitemapView(View):
+    """Отдаёт файлы, заранее собранные командой build_sitemaps.
+
+    В продакшене их лучше раздавать веб-сервером из BLOG_SITEMAP_ROOT.
+    """
+
+    def get(self, request, name='sitemap.xml'):
+        path = settings.BLOG_SITEMAP_ROOT / name
+        if not path.is_file():
+            raise Http404('Карта сайта ещё не собрана.')
+        return FileResponse(
+            path.open('rb'), content_type='application/xml; charset=utf-8'
+        )
 
 
 class PostListView(mixins.PostListMixin, ListView):
     template_name = 'blog/index.html'
 
     def get_queryset(self) -> QuerySet[Any]:
-        return get_general_posts_filter()
+        return Post.objects.visible().for_feed()
 
+    def get_count_cache_key(self):
+        return get_feed_count_key('index')
 
-class PostDetailView(mixins.PostMixin, DetailView):
+
+class SearchView(mixins.PostListMixin, ListView):
+    template_name = 'blog/search.html'
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '')[:SEARCH_QUERY_LENGTH].strip()
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return get_search_backend().filter(
+            Post.objects.visible().for_feed(), self.get_search_query()
+        )
+
+    def get_validator_queryset(self):
+        # Проверка свежести выполнила бы поиск второй раз.
+        return None
+
+    def get_context_data(self, **kwargs) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        context['pagination_query'] = urlencode({'q': context['query']}) + '&'
+        return context
+
+
+class PostDetailView(
+    mixins.AnonymousCacheMixin,
+    mixins.ConditionalGetMixin,
+    mixins.CommentPageMixin,
+    mixins.PostMixin,
+    DetailView,
+):
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
+    read_from_replica = True
+    use_last_modified = True
 
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().select_related(
-            'author',
-            'location',
-            'category',
-        )
+        return Post.objects.viewable_by(self.request.user).for_detail()
 
-    def get_object(self, queryset=None):
-        post = super().get_object(queryset=queryset)
-        if post.author != self.request.user:
-            return get_object_or_404(get_general_posts_filter(),
-                                     pk=self.kwargs.get(self.pk_url_kwarg)
-                                     )
-        return post
+    def get_validator_queryset(self):
+        return Post.objects.filter(
+            pk=self.kwargs['post_id']
+        ).viewable_by(self.request.user)
 
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        )
+        context['comments'] = self.get_comments_page(self.object)
         return context
 
+    def get_cache_tags(self, context):
+        # Имена комментаторов тоже на странице: их смена сбросит кэш.
+        return get_post_cache_tags(context['post']) + [
+            f'author:{comment.author_id}' for comment in context['comments']
+        ]
+
 
-class CategoryListView(mixins.PostListMixin, ListView):
+class CategoryListView(
+    mixins.UrlObjectsMixin,
+    mixins.PostListMixin,
+    ListView,
+):
     template_name = 'blog/category.html'
 
     def get_queryset(self) -> QuerySet[Any]:
-        category = get_object_or_404(
-            Category, slug=self.kwargs['category_slug'], is_published=True)
-        return get_general_posts_filter(
-            queryset=Post.objects.filter(category=category)
-        )
+        return self.category.posts.visible().for_feed()
+
+    def get_count_cache_key(self):
+        return get_feed_count_key('category', self.category.pk)
+
+    def get_validator_extra(self):
+        return super().get_validator_extra() + (self.category.updated_at,)
+
+    def get_cache_tags(self, context):
+        return super().get_cache_tags(context) + [
+            f'category:{self.category.pk}'
+        ]
 
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category, slug=self.kwargs['category_slug'], is_published=True)
+        context['category'] = self.category
         return context
 
 
@@ -100,24 +161,34 @@ class PostDeleteView(
         return context
 
 
-class ProfilePostListView(mixins.PostListMixin, ListView):
+class ProfilePostListView(
+    mixins.UrlObjectsMixin,
+    mixins.PostListMixin,
+    ListView,
+):
     template_name = 'blog/profile.html'
 
     def get_queryset(self) -> QuerySet[Any]:
-        self.author = get_object_or_404(
-            User,
-            username=self.kwargs['username']
+        self.apply_filters = self.request.user != self.author
+        posts = self.author.posts.for_feed()
+        if self.apply_filters:
+            posts = posts.visible()
+        return posts
+
+    def get_count_cache_key(self):
+        feed = 'author' if self.apply_filters else 'author-all'
+        return get_feed_count_key(feed, self.author.pk)
+
+    def get_validator_extra(self):
+        return super().get_validator_extra() + (
+            self.author.username,
+            self.author.get_full_name(),
         )
 
-        apply_filters = self.request.user != self.author
-        return get_general_posts_filter(
-            queryset=self.author.posts.select_related(
-                'author',
-                'location',
-                'category',
-            ),
-            apply_filters=apply_filters
-        )
+    def get_cache_tags(self, context):
+        return super().get_cache_tags(context) + [
+            f'author:{self.author.pk}'
+        ]
 
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -145,18 +216,49 @@ class EditProfileUpdateView(
 
 class CommentCreateView(
     LoginRequiredMixin,
+    mixins.UrlObjectsMixin,
     mixins.CommentFormMixin,
     CreateView
 ):
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(
-            get_general_posts_filter(),
-            pk=self.kwargs['post_id']
-        )
+        form.instance.post = self.published_post
         return super().form_valid(form)
 
 
+class CommentListView(
+    mixins.UrlObjectsMixin,
+    mixins.CommentPageMixin,
+    View,
+):
+    """Следующая страница комментариев поста: HTML-фрагмент или JSON."""
+
+    template_name = 'includes/comment_list.html'
+
+    def get(self, request, *args, **kwargs):
+        post = self.viewable_post
+        comments = self.get_comments_page(post)
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'comments': [
+                    {
+                        'id': comment.id,
+                        'author': comment.author.username,
+                        'text': comment.text,
+                        'created_at': comment.created_at,
+                    }
+                    for comment in comments
+                ],
+                'next': comments.next_cursor,
+            })
+        return render(
+            request,
+            self.template_name,
+            {'post': post, 'comments': comments},
+        )
+
+
 class CommentUpdateView(
     mixins.EditContentMixin,
     mixins.CommentFormMixin,
@@ -170,4 +272,6 @@ class CommentDeleteView(
     mixins.CommentMixin,
     DeleteView
 ):
-    pass
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
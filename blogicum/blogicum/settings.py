@@ -27,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -34,6 +35,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -61,12 +63,78 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Профиль базы данных задаётся переменными окружения BLOGICUM_DB_*.
+DB_ENGINE = os.getenv('BLOGICUM_DB_ENGINE', 'sqlite')
+
+# Сколько секунд держать соединение открытым между запросами.
+DB_CONN_MAX_AGE = int(os.getenv('BLOGICUM_DB_CONN_MAX_AGE', '60'))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('BLOGICUM_DB_NAME', 'blogicum'),
+            'USER': os.getenv('BLOGICUM_DB_USER', 'blogicum'),
+            'PASSWORD': os.getenv('BLOGICUM_DB_PASSWORD', ''),
+            'HOST': os.getenv('BLOGICUM_DB_HOST', 'localhost'),
+            'PORT': os.getenv('BLOGICUM_DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Пулер в режиме transaction (PgBouncer) не поддерживает
+            # серверные курсоры, которые использует iterator().
+            'DISABLE_SERVER_SIDE_CURSORS': (
+                os.getenv('BLOGICUM_DB_POOLER') == 'pgbouncer'
+            ),
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('BLOGICUM_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # Ожидание блокировки вместо ошибки "database is locked",
+                # в секундах. Драйвер выставляет его как busy_timeout.
+                'timeout': float(os.getenv('BLOGICUM_SQLITE_TIMEOUT', '20')),
+            },
+        }
+    }
+
+# Реплики только для чтения: пути к файлам SQLite или хосты PostgreSQL
+# через запятую. В тестах реплики подменяются основной базой.
+BLOG_REPLICA_DATABASES = []
+for number, replica in enumerate(
+        filter(None, os.getenv('BLOGICUM_DB_REPLICAS', '').split(',')), 1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgresql' else 'NAME': replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    BLOG_REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Сколько секунд после изменяющего запроса читать из основной базы.
+BLOG_REPLICA_PIN_SECONDS = int(os.getenv('BLOGICUM_REPLICA_PIN_SECONDS', '5'))
+
+# PRAGMA, выполняемые при открытии каждого соединения с SQLite
+# (см. blog.signals.configure_sqlite_connection). Режим журнала
+# и synchronous по умолчанию стандартные; BLOGICUM_SQLITE_JOURNAL_MODE=wal
+# и BLOGICUM_SQLITE_SYNCHRONOUS=normal позволяют читать параллельно
+# с записью (см. benchmark_db).
+BLOG_SQLITE_PRAGMAS = {
+    'mmap_size': int(os.getenv('BLOGICUM_SQLITE_MMAP_SIZE', '268435456')),
+    'temp_store': 'memory',
 }
+for pragma in ('journal_mode', 'synchronous'):
+    if os.getenv(f'BLOGICUM_SQLITE_{pragma.upper()}'):
+        BLOG_SQLITE_PRAGMAS[pragma] = os.getenv(
+            f'BLOGICUM_SQLITE_{pragma.upper()}'
+        )
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -114,3 +182,35 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
+
+# Keyset-пагинация лент по (pub_date, id) вместо постраничной.
+BLOG_CURSOR_PAGINATION = False
+
+# Выполнять фоновые задачи сразу, без воркера (run_worker).
+BLOG_TASKS_EAGER = False
+
+# Статические файлы карты сайта (build_sitemaps) и адрес сайта для <loc>.
+BLOG_SITEMAP_ROOT = Path(
+    os.getenv('BLOGICUM_SITEMAP_ROOT', BASE_DIR / 'sitemaps')
+)
+
+BLOG_SITE_URL = os.getenv('BLOGICUM_SITE_URL', 'http://localhost:8000')
+
+# Замер SQL-запросов и отрисовки шаблонов: заголовок Server-Timing
+# и запись в лог blog.requests для доли запросов SAMPLE_RATE.
+BLOG_REQUEST_METRICS = os.getenv('BLOGICUM_REQUEST_METRICS') == '1'
+
+BLOG_REQUEST_METRICS_SAMPLE_RATE = float(
+    os.getenv('BLOGICUM_REQUEST_METRICS_SAMPLE_RATE', '1.0')
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blog.requests': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
@@ -0,0 +1,129 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_json(response):
+    assert response["Content-Type"].startswith("application/json")
+    if response.streaming:
+        return json.loads(b"".join(response.streaming_content))
+    return json.loads(response.content)
+
+
+@pytest.fixture
+def api_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    return [
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=True, pub_date=now - timedelta(hours=number),
+        )
+        for number in range(1, 6)
+    ]
+
+
+def test_api_posts_cursor_pagination(client, api_posts):
+    data = get_json(client.get("/api/posts/?limit=3"))
+    assert [post["id"] for post in data["results"]] == [
+        post.pk for post in api_posts[:3]
+    ], "Убедитесь, что API отдаёт ленту от новых публикаций к старым."
+    assert data["next"], "Убедитесь, что API отдаёт курсор следующей страницы."
+
+    data = get_json(client.get(f"/api/posts/?limit=3&after={data['next']}"))
+    assert [post["id"] for post in data["results"]] == [
+        post.pk for post in api_posts[3:]
+    ]
+    assert data["next"] is None
+
+    response = client.get("/api/posts/?after=broken")
+    assert response.status_code == 400, (
+        "Убедитесь, что API отвечает 400 на неверный курсор."
+    )
+
+
+def test_api_sparse_fields(
+        client, api_posts, user, django_assert_num_queries):
+    with django_assert_num_queries(1) as context:
+        get_json(client.get("/api/posts/?fields=title"))
+    assert "JOIN" not in context.captured_queries[0]["sql"], (
+        "Убедитесь, что API не присоединяет таблицы для незапрошенных полей."
+    )
+    data = get_json(client.get("/api/posts/?fields=title,author"))
+    assert data["results"][0] == {
+        "title": api_posts[0].title, "author": user.username,
+    }, "Убедитесь, что API отдаёт только поля из параметра `fields`."
+    response = client.get("/api/posts/?fields=title,password")
+    assert response.status_code == 400
+
+
+def test_api_batch_by_ids(
+        client, api_posts, mixer: Mixer, user, published_category,
+        django_assert_num_queries):
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    ids = [api_posts[2].pk, scheduled.pk, api_posts[0].pk]
+    url = f"/api/posts/?ids={','.join(map(str, ids))}&fields=id"
+    with django_assert_num_queries(1):
+        data = get_json(client.get(url))
+    assert data["results"] == [
+        {"id": api_posts[2].pk}, {"id": api_posts[0].pk}
+    ], (
+        "Убедитесь, что пакетный запрос по `ids` возвращает доступные"
+        " публикации одним запросом в порядке `ids`."
+    )
+
+
+def test_api_detail_and_comments(
+        client, user_client, mixer: Mixer, user, published_category,
+        api_posts):
+    post = api_posts[0]
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    data = get_json(client.get(f"/api/posts/{post.pk}/"))
+    assert data["id"] == post.pk and data["category"] == (
+        published_category.slug
+    )
+    data = get_json(client.get(f"/api/posts/{post.pk}/comments/?limit=2"))
+    assert [comment["id"] for comment in data["results"]] == [
+        comment.pk for comment in comments[:2]
+    ] and data["next"]
+
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    for url in (
+        f"/api/posts/{scheduled.pk}/",
+        f"/api/posts/{scheduled.pk}/comments/",
+    ):
+        assert client.get(url).status_code == 404, (
+            f"Убедитесь, что `{url}` недоступен для чужой отложенной"
+            " публикации."
+        )
+        assert user_client.get(url).status_code == 200
+
+
+def test_api_category_and_profile_feeds(
+        client, user_client, mixer: Mixer, user, published_category,
+        api_posts):
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    category_url = f"/api/category/{published_category.slug}/posts/"
+    profile_url = f"/api/profile/{user.username}/posts/"
+    for url in (category_url, profile_url):
+        ids = {post["id"] for post in get_json(client.get(url))["results"]}
+        assert ids == {post.pk for post in api_posts}, (
+            f"Убедитесь, что `{url}` отдаёт только видимые публикации."
+        )
+    own = get_json(user_client.get(profile_url))["results"]
+    assert scheduled.pk in {post["id"] for post in own}, (
+        "Убедитесь, что автор видит в API свои отложенные публикации."
+    )
@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.benchmarks import compare_reports, run_benchmarks
+from blog.models import Category, Comment, Location, Post, User
+from blog.search import get_search_backend
+from blog.seeding import Seeder
+from blog.service import get_broken_comment_counters
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_seeder_is_reproducible_and_consistent():
+    counts = Seeder(seed=1).seed(30, comments=50)
+    assert Post.objects.count() == counts["posts"] == 30
+    assert Comment.objects.count() == 50
+    assert not get_broken_comment_counters().exists(), (
+        "Убедитесь, что генератор данных заполняет `comment_count` в"
+        " соответствии с созданными комментариями."
+    )
+    public = Post.objects.filter(
+        is_published=True, category__is_published=True
+    )
+    assert set(Post.objects.filter(is_public=True)) == set(public), (
+        "Убедитесь, что генератор данных заполняет поле `is_public`."
+    )
+    post = Post.objects.order_by("pk").first()
+    found = get_search_backend().filter(Post.objects.all(), post.title)
+    assert post in found, (
+        "Убедитесь, что после генерации данных публикации попадают в"
+        " поисковый индекс."
+    )
+
+    titles = list(Post.objects.order_by("pk").values_list("title", "text"))
+    for model in (Post, Category, Location, User):
+        model.objects.all().delete()
+    Seeder(seed=1).seed(30, comments=50)
+    assert list(
+        Post.objects.order_by("pk").values_list("title", "text")
+    ) == titles, (
+        "Убедитесь, что при одинаковом зерне генерируются одинаковые данные."
+    )
+
+
+def test_run_benchmarks_reports_every_scenario():
+    Seeder().seed(20)
+    results = run_benchmarks(repeat=1)
+    assert set(results) == {
+        "index", "category", "profile", "detail",
+        "comment_create", "post_create",
+    }
+    assert all(result["queries"] > 0 for result in results.values())
+    assert not Post.objects.filter(title="Публикация из замера").exists(), (
+        "Убедитесь, что замеры удаляют созданные ими публикации."
+    )
+
+
+def test_compare_reports_flags_regressions():
+    baseline = {"scenarios": {
+        "index": {"queries": 5, "median_ms": 10.0},
+        "detail": {"queries": 4, "median_ms": 10.0},
+    }}
+    current = {"scenarios": {
+        "index": {"queries": 6, "median_ms": 10.0},
+        "detail": {"queries": 4, "median_ms": 11.0},
+    }}
+    assert compare_reports(baseline, current, 0.2) == [
+        "index: запросов 5 -> 6"
+    ]
+    assert len(compare_reports(baseline, current, 0.05)) == 2
+
+
+def test_seed_blog_command_distributions(client):
+    call_command(
+        "seed_blog", posts=40, categories=4, comments=100,
+        unpublished_category_share=1.0, future_post_share=0.0,
+        unpublished_post_share=0.0, viral_post_share=0.0,
+        viral_post_comments=1.0, stdout=StringIO(),
+    )
+    assert Category.objects.filter(is_published=True).count() == 1, (
+        "Убедитесь, что параметр `--unpublished-category-share` снимает"
+        " категории с публикации."
+    )
+    visible = Post.objects.visible().count()
+    hidden = Post.objects.filter(category__is_published=False).count()
+    assert visible + hidden == 40, (
+        "Убедитесь, что посты снятых с публикации категорий не видны в"
+        " ленте, а остальные видны."
+    )
+    top = Post.objects.order_by("-comment_count").first()
+    assert top.comment_count == 100, (
+        "Убедитесь, что «вирусные» посты получают заданную долю"
+        " комментариев."
+    )
+
+    first = Post.objects.visible().order_by("-pub_date").first()
+    assert f"/posts/{first.pk}/" in client.get("/").content.decode()
+    call_command("seed_blog", posts=5, flush=True, stdout=StringIO())
+    assert Post.objects.count() == 5 and Comment.objects.count() == 10, (
+        "Убедитесь, что `seed_blog --flush` удаляет прежние данные."
+    )
+    content = client.get("/").content.decode()
+    assert f"/posts/{first.pk}/" not in content, (
+        "Убедитесь, что после `seed_blog --flush` лента не отдаётся из"
+        " устаревшего кэша."
+    )
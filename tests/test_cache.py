@@ -0,0 +1,220 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.scheduling import get_next_publication
+from blog.views import PostListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_cache_follows_post_changes(
+        mixer: Mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode()
+
+    post.title = "Обновлённый заголовок"
+    post.save()
+    content = user_client.get("/").content.decode()
+    assert "Обновлённый заголовок" in content, (
+        "Убедитесь, что после изменения поста его карточка в ленте"
+        " обновляется, а не берётся из кэша."
+    )
+
+    mixer.blend("blog.Comment", post=post)
+    content = user_client.get("/").content.decode()
+    assert "Комментарии (1)" in content, (
+        "Убедитесь, что после добавления комментария счётчик в карточке"
+        " поста обновляется."
+    )
+
+
+def test_post_card_cache_follows_category_changes(
+        user_client, post_with_published_location):
+    category = post_with_published_location.category
+    user_client.get("/")
+    category.title = "Новая категория"
+    category.save()
+    assert "Новая категория" in user_client.get("/").content.decode(), (
+        "Убедитесь, что после изменения категории карточки постов в ленте"
+        " обновляются."
+    )
+
+
+def test_anonymous_page_is_served_from_cache(
+        unlogged_client, post_with_published_location,
+        django_assert_num_queries):
+    url = f"/posts/{post_with_published_location.id}/"
+    first = unlogged_client.get(url)
+    with django_assert_num_queries(0):
+        cached = unlogged_client.get(url)
+    assert cached.content == first.content, (
+        "Убедитесь, что анонимному пользователю повторно отдаётся"
+        " закэшированная страница."
+    )
+
+
+def test_anonymous_cache_is_reset_by_tags(
+        mixer: Mixer, unlogged_client, user, post_with_published_location):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    unlogged_client.get("/")
+    unlogged_client.get(detail_url)
+
+    comment = mixer.blend("blog.Comment", post=post, text="Новый коммент")
+    assert comment.text in unlogged_client.get(detail_url).content.decode(), (
+        "Убедитесь, что после добавления комментария страница поста"
+        " не берётся из кэша."
+    )
+
+    new_post = mixer.blend(
+        "blog.Post", author=user, category=post.category,
+        title="Свежая публикация",
+    )
+    assert new_post.title in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что после добавления публикации главная страница"
+        " не берётся из кэша."
+    )
+
+    post.location.name = "Новое место"
+    post.location.save()
+    assert "Новое место" in unlogged_client.get(detail_url).content.decode(), (
+        "Убедитесь, что после изменения местоположения страница поста"
+        " не берётся из кэша."
+    )
+
+
+def test_anonymous_cache_expires_with_scheduled_post(
+        mixer: Mixer, user, published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    timeout = PostListView().get_cache_timeout()
+    assert 0 < timeout <= 30, (
+        "Убедитесь, что кэш ленты живёт не дольше, чем до ближайшей"
+        " отложенной публикации."
+    )
+
+
+def test_next_publication_is_reset_on_post_save(
+        mixer: Mixer, user, published_category):
+    assert get_next_publication() is None
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert get_next_publication() == post.pub_date, (
+        "Убедитесь, что дата ближайшей отложенной публикации"
+        " пересчитывается после сохранения публикации."
+    )
+
+
+def test_next_publication_is_reset_on_category_change(
+        mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert get_next_publication() == post.pub_date
+    published_category.is_published = False
+    published_category.save()
+    assert get_next_publication() is None, (
+        "Убедитесь, что дата ближайшей отложенной публикации"
+        " пересчитывается после снятия категории с публикации."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert get_next_publication() == post.pub_date
+
+
+def test_anonymous_feed_has_expiry_headers(
+        mixer: Mixer, unlogged_client, user, published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=100),
+    )
+    for _ in range(2):
+        response = unlogged_client.get("/")
+        max_age = int(response["Cache-Control"].split("max-age=")[1])
+        assert 0 < max_age <= 100, (
+            "Убедитесь, что заголовок Cache-Control не разрешает хранить"
+            " ленту дольше, чем до ближайшей отложенной публикации."
+        )
+        assert response.has_header("Expires")
+
+
+def test_post_detail_answers_not_modified(
+        mixer: Mixer, user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    etag = response.get("ETag")
+    assert etag and response.has_header("Last-Modified"), (
+        "Убедитесь, что страница поста отдаёт заголовки `ETag` и"
+        " `Last-Modified`."
+    )
+
+    not_modified = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304 and not not_modified.templates, (
+        "Убедитесь, что при совпадении `If-None-Match` страница поста"
+        " отвечает 304 без отрисовки шаблонов."
+    )
+
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что после добавления комментария страница поста"
+        " отдаётся заново."
+    )
+
+
+def test_feed_answers_not_modified(
+        mixer: Mixer, user, user_client, published_category,
+        post_with_published_location):
+    etag = user_client.get("/")["ETag"]
+    assert user_client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+        "Убедитесь, что лента отвечает 304, пока она не изменилась."
+    )
+
+    mixer.blend("blog.Post", author=user, category=published_category)
+    assert user_client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что после добавления публикации лента отдаётся заново."
+    )
+
+
+def test_anonymous_cached_page_answers_not_modified(
+        unlogged_client, post_with_published_location,
+        django_assert_num_queries):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = unlogged_client.get(url)["ETag"]
+    with django_assert_num_queries(0):
+        response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что закэшированная страница отвечает 304 без запросов"
+        " к базе данных."
+    )
+
+
+def test_user_save_touches_posts_only_on_rename(
+        mixer: Mixer, user, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    commenter = mixer.blend("auth.User", username="commenter")
+    mixer.blend("blog.Comment", post=post, author=commenter)
+    updated_at = type(post).objects.get(pk=post.pk).updated_at
+
+    post.author.set_password("new-password")
+    post.author.save()
+    assert type(post).objects.get(pk=post.pk).updated_at == updated_at, (
+        "Убедитесь, что смена пароля автора не обновляет его публикации."
+    )
+
+    url = f"/posts/{post.id}/"
+    assert "commenter" in unlogged_client.get(url).content.decode()
+    commenter.username = "renamed_commenter"
+    commenter.save()
+    assert type(post).objects.get(pk=post.pk).updated_at > updated_at
+    assert "renamed_commenter" in unlogged_client.get(url).content.decode(), (
+        "Убедитесь, что после переименования комментатора страница поста"
+        " не отдаётся из кэша."
+    )
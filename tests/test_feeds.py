@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("feed_format", ["rss", "atom"])
+def test_feeds_show_only_visible_posts(
+        mixer: Mixer, client, user, published_category, feed_format):
+    visible = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    for url in (
+        f"/feeds/{feed_format}/",
+        f"/category/{published_category.slug}/feeds/{feed_format}/",
+        f"/profile/{user.username}/feeds/{feed_format}/",
+    ):
+        content = client.get(url).content.decode()
+        assert visible.title in content and scheduled.title not in content, (
+            f"Убедитесь, что лента `{url}` содержит только опубликованные"
+            " публикации."
+        )
+
+
+def test_unknown_feed_format(client):
+    assert client.get("/feeds/xml/").status_code == 404
+
+
+def test_feed_is_cached_and_conditional(
+        mixer: Mixer, client, user, published_category,
+        post_with_published_location, django_assert_num_queries):
+    response = client.get("/feeds/rss/")
+    etag = response["ETag"]
+    with django_assert_num_queries(0):
+        not_modified = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304, (
+        "Убедитесь, что неизменившаяся лента отвечает 304 без запросов к"
+        " базе данных."
+    )
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+    response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and post.title in (
+        response.content.decode()
+    ), (
+        "Убедитесь, что кэш ленты сбрасывается при добавлении публикации."
+    )
@@ -0,0 +1,85 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.constants import IMAGE_VARIANTS
+from blog.images import process_post_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image_file(width=2000, height=1000):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    return SimpleUploadedFile(
+        "big_image.jpg", buffer.getvalue(), content_type="image/jpeg"
+    )
+
+
+def test_post_create_builds_image_variants(
+        user_client, user, published_category, published_location):
+    response = user_client.post(
+        "/posts/create/",
+        {
+            "title": "Пост с картинкой",
+            "text": "Текст",
+            "pub_date": "2020-01-01T10:00",
+            "category": published_category.id,
+            "location": published_location.id,
+            "image": make_image_file(),
+            "is_published": True,
+        },
+    )
+    assert response.status_code == 302
+    post = user.posts.get()
+    assert post.image_meta == {}, (
+        "Убедитесь, что изображение обрабатывается в фоновой задаче, а не"
+        " во время запроса."
+    )
+    call_command("run_worker", once=True, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image_meta["width"] == 2000
+    assert post.image_meta["height"] == 1000
+
+    variants = post.image_meta["variants"]
+    assert len(variants) == len(IMAGE_VARIANTS) * 2, (
+        "Убедитесь, что для изображения создаются все варианты размеров"
+        " в форматах JPEG и WebP."
+    )
+    for variant in variants:
+        assert variant["width"] <= IMAGE_VARIANTS[variant["name"]]
+        assert default_storage.exists(variant["path"])
+
+    content = user_client.get("/").content.decode()
+    assert post.image_srcset in content and (
+        post.image_webp_srcset in content
+    ), (
+        "Убедитесь, что карточка поста выводит srcset с вариантами"
+        " изображения."
+    )
+    assert 'width="640" height="320"' in content, (
+        "Убедитесь, что для изображения в карточке указаны размеры."
+    )
+
+
+def test_post_delete_removes_image_variants(
+        user, published_category, django_capture_on_commit_callbacks):
+    post = user.posts.create(
+        title="Пост с картинкой", text="Текст", pub_date="2020-01-01T10:00Z",
+        category=published_category, image=make_image_file(),
+    )
+    process_post_image(post)
+    paths = [variant["path"] for variant in post.image_meta["variants"]]
+    assert all(default_storage.exists(path) for path in paths)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not any(default_storage.exists(path) for path in paths), (
+        "Убедитесь, что при удалении поста удаляются варианты его"
+        " изображения."
+    )
@@ -0,0 +1,45 @@
+import logging
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_request_metrics_header_and_log(
+        settings, caplog, client, post_with_published_location):
+    settings.BLOG_REQUEST_METRICS = True
+    settings.BLOG_REQUEST_METRICS_SAMPLE_RATE = 1.0
+    with caplog.at_level(logging.INFO, logger="blog.requests"):
+        response = client.get(f"/posts/{post_with_published_location.id}/")
+
+    timing = response.get("Server-Timing", "")
+    for metric in ("db;dur=", "render;dur=", "total;dur="):
+        assert metric in timing, (
+            f"Убедитесь, что заголовок `Server-Timing` содержит `{metric}`."
+        )
+    records = [
+        record.metrics for record in caplog.records
+        if hasattr(record, "metrics")
+    ]
+    assert records and records[0]["view"] == "blog:post_detail", (
+        "Убедитесь, что для запроса пишется запись в лог `blog.requests`"
+        " с именем представления."
+    )
+    assert records[0]["queries"] > 0 and records[0]["duplicates"] == 0, (
+        "Убедитесь, что в записи лога указаны число SQL-запросов и число"
+        " повторяющихся запросов."
+    )
+
+
+def test_request_metrics_can_be_disabled(settings, client):
+    settings.BLOG_REQUEST_METRICS = True
+    settings.BLOG_REQUEST_METRICS_SAMPLE_RATE = 0.0
+    assert "Server-Timing" not in client.get("/"), (
+        "Убедитесь, что при нулевой доле выборки запросы не замеряются."
+    )
+    settings.BLOG_REQUEST_METRICS = False
+    settings.BLOG_REQUEST_METRICS_SAMPLE_RATE = 1.0
+    assert "Server-Timing" not in client.get("/"), (
+        "Убедитесь, что замеры отключаются настройкой"
+        " `BLOG_REQUEST_METRICS`."
+    )
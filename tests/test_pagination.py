@@ -0,0 +1,186 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.constants import COMMENTS_PAGINATE_COUNT
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts_with_same_dates(mixer: Mixer, user, published_category):
+    # Одинаковые даты проверяют, что курсор учитывает `id` при равенстве.
+    pub_dates = (
+        timezone.now() - timedelta(days=day // 2)
+        for day in range(N_PER_PAGE * 3)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+
+
+def walk_pages(client, url, param, cursor_key):
+    pages = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page_obj = response.context["page_obj"]
+        pages.append([post.id for post in page_obj])
+        cursor = getattr(page_obj, cursor_key)
+        if cursor is None:
+            return pages
+        response = client.get(url, {param: cursor})
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_walks_whole_feed(
+        user_client, many_posts_with_same_dates):
+    expected = sorted(
+        many_posts_with_same_dates,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+    expected_ids = [post.id for post in expected]
+
+    pages = walk_pages(user_client, "/", "after", "next_cursor")
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 3], (
+        "Убедитесь, что при курсорной пагинации на странице выводится не"
+        f" больше {N_PER_PAGE} публикаций."
+    )
+    assert sum(pages, []) == expected_ids, (
+        "Убедитесь, что при курсорной пагинации публикации выводятся по"
+        " убыванию даты публикации без пропусков и повторов."
+    )
+
+    last_page = user_client.get(
+        "/", {"after": user_client.get("/").context["page_obj"].next_cursor}
+    ).context["page_obj"]
+    previous = user_client.get("/", {"before": last_page.previous_cursor})
+    assert [post.id for post in previous.context["page_obj"]] == pages[0], (
+        "Убедитесь, что ссылка на предыдущую страницу возвращает к"
+        " предыдущим публикациям."
+    )
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_rejects_broken_cursor(user_client):
+    response = user_client.get("/", {"after": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что при неверном курсоре возвращается ошибка 404."
+    )
+
+
+def test_page_range_is_windowed(mixer: Mixer, user_client, user,
+                                published_category):
+    mixer.cycle(N_PER_PAGE * 8).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    page_obj = user_client.get("/").context["page_obj"]
+    page_numbers = [
+        i for i in page_obj.elided_page_range
+        if i != page_obj.paginator.ELLIPSIS
+    ]
+    assert page_obj.paginator.num_pages == 8
+    assert len(page_numbers) < page_obj.paginator.num_pages, (
+        "Убедитесь, что пагинатор выводит ссылки только на соседние и"
+        " крайние страницы, а не на все страницы ленты."
+    )
+
+
+def test_feed_count_is_cached_and_reset_on_new_post(
+        mixer: Mixer, user_client, user, published_category):
+    mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    first = user_client.get("/")
+    assert first.context["paginator"].count == N_PER_PAGE + 1
+
+    with CaptureQueriesContext(connection) as cold:
+        user_client.get("/", {"page": 2})
+    count_queries = [
+        q for q in cold.captured_queries if "COUNT(" in q["sql"].upper()
+    ]
+    assert not count_queries, (
+        "Убедитесь, что число публикаций в ленте берётся из кэша и не"
+        " пересчитывается на каждой странице."
+    )
+
+    mixer.blend("blog.Post", author=user, category=published_category)
+    response = user_client.get("/")
+    assert response.context["paginator"].count == N_PER_PAGE + 2, (
+        "Убедитесь, что кэш числа публикаций сбрасывается при добавлении"
+        " публикации."
+    )
+
+
+def test_feed_count_is_reset_in_previous_category(
+        mixer: Mixer, user_client, user, published_category):
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    other_category = mixer.blend("blog.Category", is_published=True)
+    url = f"/category/{published_category.slug}/"
+    assert user_client.get(url).context["paginator"].count == 2
+
+    posts[0].category = other_category
+    posts[0].save()
+    response = user_client.get(url)
+    assert response.context["paginator"].count == 1, (
+        "Убедитесь, что при переносе публикации в другую категорию"
+        " сбрасывается кэш числа публикаций и в прежней категории."
+    )
+
+
+def test_comments_are_paginated_and_loaded_by_fragments(
+        mixer: Mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PAGINATE_COUNT + 5).blend(
+        "blog.Comment", post=post
+    )
+    response = user_client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert [c.id for c in page] == [
+        c.id for c in comments[:COMMENTS_PAGINATE_COUNT]
+    ], (
+        "Убедитесь, что на странице поста выводится только первая страница"
+        " комментариев в порядке их создания."
+    )
+
+    fragment = user_client.get(
+        f"/posts/{post.id}/comments/", {"after": page.next_cursor}
+    )
+    assert fragment.status_code == HTTPStatus.OK
+    content = fragment.content.decode()
+    assert all(
+        f'name="comment_{c.id}"' in content
+        for c in comments[COMMENTS_PAGINATE_COUNT:]
+    ), (
+        "Убедитесь, что адрес подгрузки комментариев возвращает"
+        " следующую страницу комментариев."
+    )
+
+    data = user_client.get(
+        f"/posts/{post.id}/comments/",
+        {"after": page.next_cursor, "format": "json"},
+    ).json()
+    assert [c["id"] for c in data["comments"]] == [
+        c.id for c in comments[COMMENTS_PAGINATE_COUNT:]
+    ]
+    assert data["next"] is None
+
+
+def test_comments_fragment_hides_unpublished_post(
+        another_user_client, unpublished_posts_with_published_locations):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
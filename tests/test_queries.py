@@ -0,0 +1,281 @@
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_page_queries(client: Client, url: str) -> int:
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(context)
+
+
+def blend_posts(mixer: Mixer, count: int, author, category) -> list:
+    return mixer.cycle(count).blend(
+        "blog.Post",
+        author=author,
+        category=category,
+        location__is_published=True,
+    )
+
+
+@pytest.mark.parametrize("client_fixture", ["user_client", "unlogged_client"])
+@pytest.mark.parametrize("page", ["index", "category", "profile"])
+def test_feed_queries_do_not_depend_on_page_size(
+        request, mixer, user, published_category, client_fixture, page):
+    client = request.getfixturevalue(client_fixture)
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[page]
+
+    blend_posts(mixer, 1, user, published_category)
+    single_post_queries = count_page_queries(client, url)
+
+    blend_posts(mixer, N_PER_PAGE, user, published_category)
+    full_page_queries = count_page_queries(client, url)
+
+    assert full_page_queries == single_post_queries, (
+        f"Убедитесь, что количество SQL-запросов на странице `{url}` не"
+        " зависит от количества публикаций на ней: для одной публикации"
+        f" выполнено {single_post_queries} запросов, для полной страницы -"
+        f" {full_page_queries}."
+    )
+
+
+def test_comment_count_is_stored_on_post(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def count_post_delete_queries(mixer, post, comments: int) -> int:
+    mixer.cycle(comments).blend("blog.Comment", post=post)
+    with CaptureQueriesContext(connection) as context:
+        post.delete()
+    return len(context)
+
+
+def test_post_delete_queries_do_not_depend_on_comments(
+        mixer, user, published_category):
+    few = count_post_delete_queries(
+        mixer, blend_posts(mixer, 1, user, published_category)[0], 1
+    )
+    many = count_post_delete_queries(
+        mixer, blend_posts(mixer, 1, user, published_category)[0], 20
+    )
+    assert few == many, (
+        "Убедитесь, что при удалении публикации число SQL-запросов не"
+        " зависит от числа её комментариев: для одного комментария"
+        f" выполнено {few} запросов, для двадцати - {many}."
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=100)
+    post.refresh_from_db()
+    broken_updated_at = post.updated_at
+    call_command("recount_comments", verbosity=0)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " счётчики комментариев."
+    )
+    assert post.updated_at > broken_updated_at, (
+        "Убедитесь, что команда `recount_comments` обновляет поле"
+        " `updated_at` у исправленных публикаций."
+    )
+
+
+# Предельное число SQL-запросов для каждого представления `blog/views.py`.
+VIEW_QUERY_BUDGETS = [
+    ("index", "user_client", "get", "/", 6),
+    ("category", "user_client", "get", "/category/{category}/", 7),
+    ("profile", "user_client", "get", "/profile/{author}/", 7),
+    ("profile", "another_user_client", "get", "/profile/{author}/", 7),
+    ("post_detail", "user_client", "get", "/posts/{post}/", 5),
+    ("post_detail", "another_user_client", "get", "/posts/{post}/", 5),
+    ("post_detail", "unlogged_client", "get", "/posts/{post}/", 4),
+    ("create_post", "user_client", "get", "/posts/create/", 4),
+    ("edit_post", "user_client", "get", "/posts/{post}/edit/", 5),
+    ("edit_post", "another_user_client", "get", "/posts/{post}/edit/", 3),
+    ("delete_post", "user_client", "get", "/posts/{post}/delete/", 4),
+    ("add_comment", "another_user_client", "post",
+     "/posts/{post}/comment/", 7),
+    ("edit_comment", "user_client", "get",
+     "/posts/{post}/edit_comment/{comment}/", 3),
+    ("edit_comment", "user_client", "post",
+     "/posts/{post}/edit_comment/{comment}/", 5),
+    ("delete_comment", "user_client", "get",
+     "/posts/{post}/delete_comment/{comment}/", 3),
+    ("edit_profile", "user_client", "get", "/profile/edit/", 2),
+]
+
+
+@pytest.mark.parametrize(
+    ("view_name", "client_fixture", "method", "url", "budget"),
+    VIEW_QUERY_BUDGETS,
+    ids=[f"{name}-{client}-{method}"
+         for name, client, method, *_ in VIEW_QUERY_BUDGETS],
+)
+def test_view_query_budget(
+        request, mixer, user, post_with_published_location,
+        view_name, client_fixture, method, url, budget):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = url.format(
+        category=post.category.slug,
+        author=user.username,
+        post=post.id,
+        comment=comment.id,
+    )
+    client = request.getfixturevalue(client_fixture)
+    with CaptureQueriesContext(connection) as context:
+        getattr(client, method)(url, {"text": "Текст"} if method == "post"
+                                else {})
+    assert len(context) <= budget, (
+        f"Убедитесь, что представление `{view_name}` выполняет не больше"
+        f" {budget} SQL-запросов; выполнено {len(context)}."
+    )
+
+
+def test_comment_of_another_post_is_not_editable(
+        mixer, user, user_client, post_with_published_location,
+        post_with_another_category):
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    response = user_client.get(
+        f"/posts/{post_with_another_category.id}/edit_comment/{comment.id}/"
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что комментарий нельзя открыть по адресу чужого поста."
+    )
+
+
+def test_post_visibility_follows_category(
+        mixer, user, published_category, unlogged_client):
+    post = blend_posts(mixer, 1, user, published_category)[0]
+    post.refresh_from_db()
+    assert post.is_public, (
+        "Убедитесь, что опубликованный пост в опубликованной категории"
+        " помечается полем `is_public`."
+    )
+
+    published_category.is_published = False
+    published_category.save()
+    post.refresh_from_db()
+    assert not post.is_public, (
+        "Убедитесь, что при снятии категории с публикации её посты"
+        " перестают считаться видимыми в ленте."
+    )
+    assert post.title not in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что посты из снятой с публикации категории не"
+        " отображаются на главной странице."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    post.refresh_from_db()
+    assert post.is_public, (
+        "Убедитесь, что при возврате категории в публикацию её посты"
+        " снова видны в ленте."
+    )
+
+
+def test_repair_post_visibility_command(
+        mixer, user, published_category, unlogged_client):
+    post = blend_posts(mixer, 1, user, published_category)[0]
+    hidden = blend_posts(mixer, 1, user, published_category)[0]
+    type(post).objects.filter(pk=hidden.pk).update(is_published=False)
+    type(post).objects.update(is_public=False)
+    type(post).objects.filter(pk=hidden.pk).update(is_public=True)
+    unlogged_client.get("/")
+
+    call_command("repair_post_visibility", chunk_size=1, stdout=StringIO())
+
+    post.refresh_from_db()
+    hidden.refresh_from_db()
+    assert post.is_public and not hidden.is_public, (
+        "Убедитесь, что команда `repair_post_visibility` исправляет поле"
+        " `is_public` в обе стороны."
+    )
+    assert post.title in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что после команды `repair_post_visibility` кэш лент"
+        " сбрасывается и исправленные посты видны на главной странице."
+    )
+
+
+def test_db_fixture_loads(settings):
+    call_command(
+        "loaddata", str(Path(settings.BASE_DIR) / "db.json"), verbosity=0
+    )
+    assert Post.objects.exists(), (
+        "Убедитесь, что фикстура `db.json` загружается командой `loaddata`"
+        " в базу с применёнными миграциями."
+    )
+
+
+def test_db_fixture_posts_are_visible(settings, unlogged_client):
+    call_command(
+        "loaddata", str(Path(settings.BASE_DIR) / "db.json"), verbosity=0
+    )
+    post = Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).first()
+    assert post.is_public, (
+        "Убедитесь, что при загрузке фикстуры командой `loaddata`"
+        " у опубликованных постов заполняется поле `is_public`."
+    )
+    assert post.title in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что посты из фикстуры `db.json` отображаются"
+        " на главной странице."
+    )
+
+
+def test_comment_create_checks_visibility_without_joins(
+        another_user_client, post_with_published_location):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as context:
+        another_user_client.post(
+            f"/posts/{post.id}/comment/", {"text": "Текст"}
+        )
+    post_selects = [
+        query["sql"] for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+        and 'FROM "blog_post"' in query["sql"]
+    ]
+    assert post_selects and all(
+        "JOIN" not in sql for sql in post_selects
+    ), (
+        "Убедитесь, что при добавлении комментария видимость поста"
+        " проверяется запросом без JOIN."
+    )
@@ -0,0 +1,54 @@
+import pytest
+
+from blog.models import Task
+from blog.queue import enqueue, run_pending, task
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task
+def remember_call(value):
+    calls.append(value)
+
+
+@task
+def always_fail():
+    raise RuntimeError("Ошибка задачи")
+
+
+def test_queued_task_runs_once():
+    calls.clear()
+    enqueue(remember_call, value=1)
+    assert calls == [], "Убедитесь, что задача не выполняется сразу."
+    assert Task.objects.get().name == f"{__name__}.remember_call", (
+        "Убедитесь, что задача сохраняется под именем с модулем, чтобы"
+        " одноимённые функции разных модулей не смешивались."
+    )
+    assert run_pending() == 1
+    assert run_pending() == 0
+    assert calls == [1], (
+        "Убедитесь, что воркер выполняет задачу ровно один раз."
+    )
+    assert not Task.objects.exists()
+
+
+def test_failed_task_is_postponed():
+    enqueue(always_fail)
+    assert run_pending() == 1
+    task_obj = Task.objects.get()
+    assert task_obj.status == Task.Status.PENDING
+    assert task_obj.attempts == 1
+    assert "Ошибка задачи" in task_obj.last_error
+    assert run_pending() == 0, (
+        "Убедитесь, что упавшая задача повторяется только после паузы."
+    )
+
+
+def test_eager_mode_runs_task_inline(settings):
+    settings.BLOG_TASKS_EAGER = True
+    calls.clear()
+    enqueue(remember_call, value=2)
+    assert calls == [2]
+    assert not Task.objects.exists()
@@ -0,0 +1,61 @@
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.middleware import PRIMARY_PIN_COOKIE, ReplicaRoutingMiddleware
+from blog.models import Post
+from blog.routers import ReplicaRouter
+from blog.views import CommentCreateView, PostListView
+
+
+def route_request(request, view_class):
+    databases = []
+
+    def get_response(request):
+        # Так же, как обработчик Django: process_view перед представлением.
+        middleware.process_view(request, view_class.as_view(), (), {})
+        databases.append(ReplicaRouter().db_for_read(Post))
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    response = middleware(request)
+    return databases[0], response
+
+
+def test_feed_reads_go_to_replica(settings):
+    settings.BLOG_REPLICA_DATABASES = ["replica_1"]
+    database, _ = route_request(RequestFactory().get("/"), PostListView)
+    assert database == "replica_1", (
+        "Убедитесь, что GET-запрос к ленте читает данные с реплики."
+    )
+    assert ReplicaRouter().db_for_read(Post) == "default", (
+        "Убедитесь, что после ответа чтение снова идёт в основную базу."
+    )
+
+
+def test_writes_pin_client_to_primary(settings):
+    settings.BLOG_REPLICA_DATABASES = ["replica_1"]
+    request = RequestFactory().post("/posts/1/comment/")
+    database, response = route_request(request, CommentCreateView)
+    assert database == "default", (
+        "Убедитесь, что изменяющие запросы работают с основной базой."
+    )
+    assert PRIMARY_PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после изменяющего запроса клиент получает cookie,"
+        " закрепляющую его за основной базой."
+    )
+
+    request = RequestFactory().get("/")
+    request.COOKIES[PRIMARY_PIN_COOKIE] = "1"
+    database, _ = route_request(request, PostListView)
+    assert database == "default", (
+        "Убедитесь, что сразу после изменения клиент читает ленту из"
+        " основной базы."
+    )
+
+
+def test_no_replicas_configured(settings):
+    settings.BLOG_REPLICA_DATABASES = []
+    database, _ = route_request(RequestFactory().get("/"), PostListView)
+    assert database == "default", (
+        "Убедитесь, что без настроенных реплик всё читается из основной базы."
+    )
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import search as search_module
+from blog.search import get_search_backend
+
+pytestmark = [pytest.mark.django_db]
+
+
+def search(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что страница поиска `/search/` загружается без ошибок."
+    )
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_uses_russian_stemming(
+        mixer: Mixer, user_client, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Прогулки с котами", text="Рассказ о домашних животных",
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Про собак", text="Совсем другая история",
+    )
+    assert search(user_client, "кот") == [post.id], (
+        "Убедитесь, что поиск находит публикации по другим формам слова."
+    )
+    assert search(user_client, "домашнее животное") == [post.id]
+
+
+def test_search_respects_visibility(
+        mixer: Mixer, user_client, user, published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Отложенная заметка", pub_date=timezone.now() + timedelta(1),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category__is_published=False,
+        title="Заметка в скрытой категории",
+    )
+    assert search(user_client, "заметка") == [], (
+        "Убедитесь, что поиск не показывает публикации, скрытые из ленты."
+    )
+
+
+def test_search_limit_applies_to_visible_posts(
+        mixer: Mixer, user_client, user, published_category, monkeypatch):
+    monkeypatch.setattr(search_module, "SEARCH_MAX_RESULTS", 1)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Заметка", text="заметка заметка заметка",
+        pub_date=timezone.now() + timedelta(1),
+    )
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Длинная история", text="Одна заметка среди других слов",
+    )
+    assert search(user_client, "заметка") == [post.id], (
+        "Убедитесь, что скрытые публикации не вытесняют видимые из"
+        " результатов поиска."
+    )
+
+
+def test_search_match_query_does_not_scan_posts():
+    backend = get_search_backend()
+    sql, params = backend.get_match_sql(backend.build_match("заметка"))
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = [row[-1] for row in cursor.fetchall()]
+    assert any(step.startswith("SCAN f VIRTUAL TABLE") for step in plan)
+    assert not any(step.startswith("SCAN p") for step in plan), (
+        "Убедитесь, что поиск не перебирает все публикации: видимость"
+        " проверяется по первичному ключу найденных строк."
+        f" План запроса: {plan}"
+    )
+
+
+def test_search_index_follows_edits(
+        mixer: Mixer, user_client, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Старый заголовок",
+    )
+    post.title = "Новый заголовок"
+    post.save()
+    assert search(user_client, "новый") == [post.id]
+    assert search(user_client, "старый") == []
+    post.delete()
+    assert search(user_client, "новый") == []
+
+
+def test_rebuild_search_index_command(
+        mixer: Mixer, user_client, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Заметка для индекса",
+    )
+    get_search_backend().clear()
+    assert search(user_client, "индекс") == []
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert search(user_client, "индекс") == [post.id], (
+        "Убедитесь, что команда `rebuild_search_index` восстанавливает"
+        " поисковый индекс."
+    )
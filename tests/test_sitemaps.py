@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import sitemaps
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def sitemap_root(settings, tmp_path, monkeypatch):
+    settings.BLOG_SITEMAP_ROOT = tmp_path
+    monkeypatch.setattr(sitemaps, "SITEMAP_SEGMENT_SIZE", 2)
+    return tmp_path
+
+
+@pytest.fixture
+def sitemap_posts(mixer: Mixer, user, published_category):
+    return [
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        )
+        for _ in range(5)
+    ]
+
+
+def test_sitemap_segments(
+        sitemap_root, sitemap_posts, mixer: Mixer, user, published_category,
+        client):
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    call_command("build_sitemaps")
+
+    posts_xml = "".join(
+        path.read_text() for path in sitemap_root.glob("posts-*.xml")
+    )
+    for post in sitemap_posts:
+        assert f"/posts/{post.pk}/</loc>" in posts_xml, (
+            "Убедитесь, что сегменты карты сайта содержат все видимые"
+            " публикации."
+        )
+    assert f"/posts/{scheduled.pk}/</loc>" not in posts_xml, (
+        "Убедитесь, что отложенные публикации не попадают в карту сайта."
+    )
+    assert f"/profile/{user.username}/" in (
+        sitemap_root / "profiles-0.xml"
+    ).read_text()
+    assert f"/category/{published_category.slug}/" in (
+        sitemap_root / "categories.xml"
+    ).read_text()
+
+    index = client.get("/sitemap.xml")
+    content = b"".join(index.streaming_content).decode()
+    assert index.status_code == 200 and "/sitemaps/posts-0.xml" in content, (
+        "Убедитесь, что `/sitemap.xml` отдаёт индекс сегментов карты сайта."
+    )
+    segment = client.get("/sitemaps/categories.xml")
+    assert segment.status_code == 200
+    assert client.get("/sitemaps/manifest.json").status_code == 404
+
+
+def test_sitemap_refreshes_only_changed_segments(
+        sitemap_root, sitemap_posts):
+    assert sitemaps.SitemapBuilder().build()["posts"] == 3
+    assert sitemaps.SitemapBuilder().build()["posts"] == 0, (
+        "Убедитесь, что без изменений сегменты карты сайта не"
+        " перезаписываются."
+    )
+
+    hidden = sitemap_posts[0]
+    Post.objects.filter(pk=hidden.pk).update(is_public=False)
+    assert sitemaps.SitemapBuilder().build()["posts"] == 1, (
+        "Убедитесь, что перезаписывается только сегмент с изменившейся"
+        " публикацией."
+    )
+    assert f"/posts/{hidden.pk}/</loc>" not in "".join(
+        path.read_text() for path in sitemap_root.glob("posts-*.xml")
+    )
+    assert sitemaps.SitemapBuilder().build(full=True)["posts"] == 3